@@ -0,0 +1,83 @@
+"""Benchmark parsing locate-us result cards: one parser per card (old scraper) vs one pass over page_source.
+
+The fixture is a page saved by the scraper (SCRAPE_SAVE_PAGE=page.html python mcd_kualalumpur.py)
+or, without --page, a synthetic page with the live site's card markup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_card_parse --sizes 50 500 5000
+    python -m benchmarks.bench_card_parse --page page.html
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import card_parser
+from benchmarks.synthetic import locate_page
+from card_parser import CARD_SELECTOR, parse_cards
+
+
+def parse_per_card(card_html):
+    """The old scraper's loop, minus the WebDriver round-trip per card"""
+    cards = []
+    for html in card_html:
+        soup = BeautifulSoup(html, 'html.parser')
+        script = soup.find('script', type='application/ld+json')
+        json_ld = script.string if script else None
+        perk_texts = (span.get_text(strip=True) for span in soup.select(card_parser.PERK_SELECTOR))
+        cards.append(card_parser._card(json_ld, perk_texts, card_parser._soup_waze_attrs(soup)))
+    return cards
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(label: str, page: str, repeat: int):
+    # innerHTML of every card, as the old scraper fetched it one RPC at a time (not timed).
+    card_html = [element.decode_contents() for element in BeautifulSoup(page, 'html.parser').select(CARD_SELECTOR)]
+    expected = parse_per_card(card_html)
+
+    results = {"per-card html.parser": timed(lambda: parse_per_card(card_html), repeat),
+               "one pass html.parser": timed(lambda: card_parser._parse_soup(page), repeat)}
+    if card_parser.lxml_html is not None:
+        results["one pass lxml"] = timed(lambda: card_parser._parse_lxml(page), repeat)
+
+    same = parse_cards(page) == expected
+    print(f"\n{label}: {len(card_html)} cards, {len(page) / 1024:.0f} KiB | {card_parser.parser_name()} output "
+          f"{'matches' if same else 'DIFFERS FROM'} per-card parsing")
+    base = results["per-card html.parser"]
+    for name, ms in results.items():
+        print(f"  {name:<22} {ms:9.2f} ms | {ms * 1000 / max(1, len(card_html)):7.1f} us/card | {base / ms:5.1f}x")
+    return same
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--page", help="saved page_source to parse instead of synthetic pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    if card_parser.lxml_html is None:
+        print("lxml is not installed; only the BeautifulSoup paths are measured")
+
+    ok = True
+    if args.page:
+        with open(args.page, encoding="utf-8") as f:
+            ok = run(args.page, f.read(), args.repeat)
+    else:
+        for size in args.sizes:
+            ok = run(f"synthetic {size}", locate_page(size), args.repeat) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark POST /chat/batch against the same questions sent as sequential /chat calls.
+
+The response cache is cleared before every run, so the batch only wins by
+sharing filtering and ranking between questions with the same entities and by
+answering everything from one snapshot in one request.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chat_batch --outlets 10000 --questions 100 1000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+
+import main as app_main
+from benchmarks.synthetic import generate_snapshot
+
+QUESTIONS = [
+    "Which outlets in Bangsar have drive-thru?",
+    "Find 24 hours McDonald's in Petaling Jaya",
+    "Where can I get breakfast near Cheras?",
+    "Show me outlets with wifi in Kuala Lumpur",
+    "Any McCafe in Johor Bahru?",
+    "I need a place for a birthday party in Shah Alam",
+    "Is there a drive thru in Bangsar?",
+    "24 hour outlets in Petaling Jaya",
+]
+
+
+def make_questions(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [{"question": rng.choice(QUESTIONS), "session_id": f"bench-{i % 50}"} for i in range(n)]
+
+
+async def run(client: httpx.AsyncClient, questions):
+    app_main.chatbot.response_cache.clear()
+    started = time.perf_counter()
+    sequential = []
+    for question in questions:
+        response = await client.post("/chat", json=question)
+        response.raise_for_status()
+        sequential.append(response.json())
+    sequential_s = time.perf_counter() - started
+
+    app_main.chatbot.response_cache.clear()
+    started = time.perf_counter()
+    response = await client.post("/chat/batch", json=questions)
+    response.raise_for_status()
+    batched = response.json()
+    batch_s = time.perf_counter() - started
+
+    assert [r["answer"] for r in batched] == [r["answer"] for r in sequential]
+    n = len(questions)
+    print(f"{n:>6} questions | sequential /chat {n / sequential_s:8.1f} q/s | /chat/batch {n / batch_s:8.1f} q/s"
+          f" ({sequential_s / batch_s:.1f}x)")
+
+
+async def run_all(sizes):
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await run(client, make_questions(10))  # warm up
+        for n in sizes:
+            await run(client, make_questions(n))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, default=10000)
+    parser.add_argument("--questions", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args(argv)
+
+    app_main.outlet_store.install(generate_snapshot(args.outlets))
+    app_main.outlet_store.poll_interval = 3600
+    asyncio.run(run_all(args.questions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
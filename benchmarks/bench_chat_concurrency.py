@@ -0,0 +1,109 @@
+"""Load-test /chat at increasing concurrency with DB access on and off the event loop.
+
+The outlet store runs in strict-freshness mode (poll interval 0), so every chat
+request checks the data version against a SQLite stand-in with simulated
+network latency. "offloaded" is the app as shipped; "blocking" runs the same
+DB work inline on the event loop, which is what the route did before.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chat_concurrency --concurrency 1 4 16 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+import main as app_main
+from benchmarks.sqlite_db import connect_factory, create_database
+from benchmarks.synthetic import generate_rows
+from db import ConnectionPool
+
+MESSAGES = [
+    "Which outlets in Bangsar have drive-thru?",
+    "Find 24 hours McDonald's in Petaling Jaya",
+    "Where can I get breakfast near Cheras?",
+    "Show me outlets with wifi in Kuala Lumpur",
+    "Any McCafe in Johor Bahru?",
+    "I need a place for a birthday party in Shah Alam",
+]
+MIN_SPEEDUP = 2.0
+
+
+async def _drive(client: httpx.AsyncClient, requests: int, concurrency: int):
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            t0 = time.perf_counter()
+            response = await client.post("/chat", json={"question": MESSAGES[i % len(MESSAGES)]})
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def run(mode: str, levels, requests: int):
+    store = app_main.outlet_store
+    if mode == "blocking":
+        async def blocking_get():
+            return store.get()
+        store.get_async = blocking_get
+    else:
+        store.__dict__.pop("get_async", None)
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _drive(client, min(requests, 20), 1)  # warm up
+        for concurrency in levels:
+            rps, p50, p99 = await _drive(client, requests, concurrency)
+            results[concurrency] = rps
+            print(f"{mode:>9} | concurrency {concurrency:>3} | {rps:8.1f} req/s | p50 {p50:7.1f} ms | p99 {p99:7.1f} ms")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated DB round trip per statement")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outlets.db")
+        create_database(path, *generate_rows(args.outlets))
+        pool = ConnectionPool({}, size=args.pool_size, connect=connect_factory(path, args.latency_ms))
+        app_main.db_pool = pool
+        app_main.outlet_store.pool = pool
+        app_main.outlet_store.poll_interval = 0
+        try:
+            blocking = asyncio.run(run("blocking", args.concurrency, args.requests))
+            offloaded = asyncio.run(run("offloaded", args.concurrency, args.requests))
+        finally:
+            pool.close()
+
+    low, high = min(args.concurrency), max(args.concurrency)
+    speedup = offloaded[high] / offloaded[low]
+    print(f"offloaded speedup {low} -> {high}: {speedup:.1f}x "
+          f"(blocking: {blocking[high] / blocking[low]:.1f}x); pool: {pool.stats()}")
+    if high >= 4 * low and speedup < MIN_SPEEDUP:
+        print(f"FAIL: /chat throughput did not scale with concurrency (expected >= {MIN_SPEEDUP}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Benchmark conversation memory: insert cost, bounded size and /chat/memory stats cost vs turns recorded.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chat_memory --turns 10 10000 1000000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from conversation_memory import ConversationMemory
+
+INTENTS = ["service_inquiry", "location_search", "general_info", "navigation"]
+LOCATIONS = ["bangsar", "kuala lumpur", "cheras", "petaling jaya", "mid valley", "klcc", "subang"]
+SERVICES = ["24_hours", "drive_thru", "wifi", "mccafe", "breakfast", "birthday_party"]
+
+
+def run(turns: int, sessions: int, seed: int = 1):
+    rng = random.Random(seed)
+    memory = ConversationMemory()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(turns):
+        memory.append(
+            {"query": f"question {i}", "timestamp": datetime.now(), "user_location": None},
+            f"session-{rng.randrange(sessions)}",
+            intent=rng.choice(INTENTS),
+            locations=rng.sample(LOCATIONS, rng.randint(0, 2)),
+            services=rng.sample(SERVICES, rng.randint(0, 2)),
+        )
+    insert_us = (time.perf_counter() - started) * 1e6 / turns
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    for _ in range(200):
+        t0 = time.perf_counter()
+        memory.stats()
+        memory.recent()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    print(f"{turns:>9} turns | stored {len(memory):>7} | insert {insert_us:5.1f} us/turn"
+          f" | stats {statistics.median(samples):6.1f} us | peak traced {peak / 2**20:7.1f} MiB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 10000, 1000000])
+    parser.add_argument("--sessions", type=int, default=50000)
+    args = parser.parse_args(argv)
+    for turns in args.turns:
+        run(turns, args.sessions)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark capped /chat pages and cursor continuations against answering with every matching outlet.
+
+Also reports the memory each held cursor costs; it must not grow with the number of matches.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chat_pages --sizes 10000 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+import main as app_main
+from benchmarks.synthetic import generate_snapshot
+
+QUERY = "Show me all McDonald's outlets"
+CURSORS = 200  # answers held while measuring memory per cursor
+
+
+def timed(fn, repeat: int, cold: bool = True) -> float:
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            app_main.chatbot.response_cache.clear()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(size: int, repeat: int, limit: int):
+    snapshot = generate_snapshot(size)
+    app_main.outlet_store.install(snapshot)
+    bot = app_main.chatbot
+    first = bot.answer_query(QUERY, snapshot, limit=limit)  # also builds the per-snapshot indexes
+    assert first.next_cursor and len(first.outlets) == limit
+
+    everything_ms = timed(lambda: bot.answer_query(QUERY, snapshot, limit=size).model_dump_json(), repeat)
+    page_ms = timed(lambda: bot.answer_query(QUERY, snapshot, limit=limit).model_dump_json(), repeat)
+    cursor = bot.answer_query(QUERY, snapshot, limit=limit).next_cursor
+    last_offset = limit * app_main.CHAT_CURSOR_MAX_PAGES
+    last = bot.cursors.encode(bot.cursors.resume(cursor)[0], last_offset)
+    next_ms = timed(lambda: bot.answer_query("", None, cursor=cursor).model_dump_json(), repeat, cold=False)
+    last_ms = timed(lambda: bot.answer_query("", None, cursor=last).model_dump_json(), repeat, cold=False)
+    cursor_kb = held_per_cursor(bot, snapshot, limit) / 1024
+    print(f"{size:>8} outlets, {first.total} matches | every outlet {everything_ms:8.1f} ms"
+          f" | top-{limit} page {page_ms:6.1f} ms | next page via cursor {next_ms:6.2f} ms"
+          f" | last page (offset {last_offset}) {last_ms:6.2f} ms | {cursor_kb:6.1f} KiB per cursor")
+
+
+def held_per_cursor(bot, snapshot, limit: int) -> float:
+    """Bytes each held cursor adds, over CURSORS distinct answers to the same (cached) question"""
+    bot.answer_query(QUERY, snapshot, limit=limit)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cursors = [bot.answer_query(QUERY, snapshot, limit=limit).next_cursor for _ in range(CURSORS)]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert all(cursors)
+    return held / CURSORS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=app_main.CHAT_RESULT_LIMIT)
+    args = parser.parse_args(argv)
+    app_main.outlet_store.poll_interval = 3600
+    app_main.CHAT_RESULT_MAX = max(args.sizes)  # allow the uncapped comparison
+    for size in args.sizes:
+        run(size, args.repeat, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Benchmark time to first event of /chat/stream against building /chat's answer for "list all" queries.
+
+Events are drawn straight from the route's SSE generator, since the httpx ASGI
+transport buffers whole responses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chat_stream --sizes 1000 10000 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import main as app_main
+from benchmarks.synthetic import generate_snapshot
+
+QUERY = "Show me all McDonald's outlets"
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        app_main.chatbot.response_cache.clear()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(size: int, repeat: int):
+    snapshot = generate_snapshot(size)
+    app_main.outlet_store.install(snapshot)
+    bot = app_main.chatbot
+    bot.answer_query(QUERY, snapshot)  # build the per-snapshot indexes
+
+    def first_event():
+        events = app_main._iter_sse(bot.stream_query(QUERY, snapshot))
+        next(events)
+        events.close()
+
+    def whole_stream():
+        for _ in app_main._iter_sse(bot.stream_query(QUERY, snapshot)):
+            pass
+
+    def whole_answer():
+        bot.answer_query(QUERY, snapshot, limit=size).model_dump_json()
+
+    first_ms = timed(first_event, repeat)
+    stream_ms = timed(whole_stream, repeat)
+    answer_ms = timed(whole_answer, repeat)
+    print(f"{size:>8} outlets | /chat/stream first event {first_ms:7.2f} ms, all events {stream_ms:8.1f} ms"
+          f" | /chat with every outlet {answer_ms:8.1f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    app_main.outlet_store.poll_interval = 3600
+    app_main.CHAT_RESULT_MAX = max(args.sizes)  # let /chat return every outlet, as it did before paging
+    for size in args.sizes:
+        run(size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Microbenchmark chat entity/intent extraction: one keyword-automaton pass vs repeated scans.
+
+The legacy functions below are the previous AgenticChatbot implementation,
+kept here as the reference the single-pass matcher must agree with.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_entity_extraction
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.synthetic import generate_snapshot
+from main import AgenticChatbot
+
+QUERIES = [
+    "Which outlets in Bangsar have drive-thru?",
+    "Find 24 hours McDonald's in Petaling Jaya",
+    "Where can I get breakfast near Cheras at 7am?",
+    "Show me outlets with wifi in KL",
+    "Any McCafe at klcc or mid valley?",
+    "I need a place for a birthday party in Shah Alam this evening",
+    "List all outlets",
+    "How to get to the nearest outlet in Subang?",
+    "Do you have delivery around mont kiara",
+    "Tell me about McDonald's in Damansara with surau and cashless payment",
+    "directions to pavilion please",
+    "Which outlet is open late night near bukit bintang",
+]
+
+
+def legacy_extract_entities(bot, text):
+    entities = {'locations': [], 'services': [], 'time_references': [], 'numbers': []}
+    location_patterns = [
+        r'\b(?:in|at|near|around)\s+([a-z\s]+?)(?:\s|$|,|\?|!)',
+        r'\b(kuala lumpur|kl|klcc|bukit bintang|pavilion|mid valley|bangsar|mont kiara)\b',
+        r'\b(petaling jaya|pj|subang|shah alam|damansara|cheras|ampang)\b'
+    ]
+    for pattern in location_patterns:
+        matches = re.findall(pattern, text.lower())
+        entities['locations'].extend([m.strip() for m in matches if m.strip()])
+    text_lower = text.lower()
+    for service, info in bot.knowledge_base.service_knowledge.items():
+        for keyword in info['keywords']:
+            if keyword in text_lower:
+                entities['services'].append(service)
+                break
+    for pattern in [r'\b(\d{1,2})\s*(?:am|pm)\b', r'\b(morning|afternoon|evening|night)\b']:
+        entities['time_references'].extend(re.findall(pattern, text.lower()))
+    entities['numbers'] = [int(n) for n in re.findall(r'\b(\d+)\b', text)]
+    return entities
+
+
+def legacy_reason_about_intent(query, entities):
+    reasoning_steps = []
+    intent_scores = defaultdict(float)
+    query_lower = query.lower()
+    if any(p in query_lower for p in ['list all', 'show all', 'all outlets', 'all locations', 'every outlet', 'complete list']):
+        return 'general_info', 0.9, "Detected 'list all' request - overriding other intents"
+    if entities['services']:
+        intent_scores['service_inquiry'] += 0.8
+        reasoning_steps.append(f"Detected service keywords: {entities['services']}")
+    if any(kw in query_lower for kw in ['allows', 'allow', 'support', 'supports', 'offer', 'offers', 'provide', 'provides',
+                                        'have', 'has', 'available', 'can i', 'do you', 'which', 'what', 'where can i']):
+        intent_scores['service_inquiry'] += 0.6
+        reasoning_steps.append("Found service inquiry keywords")
+    if entities['locations']:
+        intent_scores['location_search'] += 0.5
+        reasoning_steps.append(f"Detected locations: {entities['locations']}")
+    if entities['time_references']:
+        intent_scores['service_inquiry'] += 0.3
+        reasoning_steps.append(f"Detected time references: {entities['time_references']}")
+    if any(kw in query_lower for kw in ['where', 'nearest', 'closest', 'find', 'locate', 'address']) and not entities['services']:
+        intent_scores['location_search'] += 0.5
+        reasoning_steps.append("Found location search keywords")
+    if any(kw in query_lower for kw in ['direction', 'how to get', 'way to', 'navigate', 'route']):
+        intent_scores['navigation'] += 0.7
+        reasoning_steps.append("Found navigation keywords")
+    if any(kw in query_lower for kw in ['list', 'show', 'tell me about', 'information']) and not entities['services']:
+        intent_scores['general_info'] += 0.4
+        reasoning_steps.append("Found general information keywords")
+    if not intent_scores:
+        return 'general_info', 0.3, "No specific intent detected, defaulting to general information"
+    best_intent = max(intent_scores, key=intent_scores.get)
+    return best_intent, min(intent_scores[best_intent], 1.0), " | ".join(reasoning_steps)
+
+
+def legacy(bot, query):
+    entities = legacy_extract_entities(bot, query)
+    return entities, legacy_reason_about_intent(query, entities)
+
+
+def single_pass(bot, query, snapshot=None):
+    hits = bot._scan_query(query, snapshot)
+    entities = bot._extract_entities(query, hits)
+    return entities, bot._reason_about_intent(query, entities, hits)
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for query in QUERIES:
+            fn(query)
+        samples.append((time.perf_counter() - t0) * 1e6 / len(QUERIES))
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--outlets", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    bot = AgenticChatbot()
+    snapshot = generate_snapshot(args.outlets)
+    matcher = bot._entity_matcher(snapshot)
+
+    for query in QUERIES:
+        (old_entities, old_intent), (new_entities, new_intent) = legacy(bot, query), single_pass(bot, query)
+        for key in ('services', 'time_references', 'numbers'):
+            assert old_entities[key] == new_entities[key], (query, key)
+        # The matcher only adds alias/locality hits after the legacy regex matches.
+        assert new_entities['locations'][:len(old_entities['locations'])] == old_entities['locations'], query
+        if new_entities['locations'] == old_entities['locations']:
+            assert old_intent == new_intent, query
+
+    legacy_us = timed(lambda q: legacy(bot, q), args.repeat)
+    static_us = timed(lambda q: single_pass(bot, q), args.repeat)
+    snapshot_us = timed(lambda q: single_pass(bot, q, snapshot), args.repeat)
+    print(f"legacy scans            {legacy_us:7.1f} us/query")
+    print(f"single pass             {static_us:7.1f} us/query ({legacy_us / static_us:.1f}x)")
+    print(f"single pass + localities {snapshot_us:6.1f} us/query ({len(matcher)} patterns)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Benchmark metrics overhead: per-observation cost and /chat latency with and without the middleware.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_metrics --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+
+import httpx
+from starlette.middleware import Middleware
+
+import main as app_main
+from benchmarks.synthetic import generate_snapshot
+from metrics import Histogram, MetricsMiddleware, stage
+
+QUESTION = {"question": "Which outlets in Bangsar have drive-thru?"}
+
+
+def per_call_ns(stmt, number: int = 200000) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def set_middleware(enabled: bool):
+    app = app_main.app
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not MetricsMiddleware]
+    if enabled:
+        app.user_middleware.append(Middleware(MetricsMiddleware))
+    app.middleware_stack = app.build_middleware_stack()
+
+
+async def request_ms(client: httpx.AsyncClient, path: str, requests: int, **kwargs) -> float:
+    samples = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = await client.request("POST" if "json" in kwargs else "GET", path, **kwargs)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def compare(requests: int):
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Alternate the two setups so drift (warm caches, CPU frequency) hits both alike.
+        for enabled in (False, True, False, True):
+            set_middleware(enabled)
+            chat_ms = await request_ms(client, "/chat", requests, json=QUESTION)
+            outlet_ms = await request_ms(client, "/outlets/1", requests)
+            label = "with metrics" if enabled else "no middleware"
+            print(f"{label:>13} | POST /chat p50 {chat_ms:6.3f} ms | GET /outlets/1 p50 {outlet_ms:6.3f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    histogram = Histogram("bench_seconds", "benchmark only", ("label",))
+    observe_ns = per_call_ns(lambda: histogram.observe(0.003, "x"))
+
+    def with_span():
+        with stage("bench"):
+            pass
+    span_ns = per_call_ns(with_span)
+    print(f"Histogram.observe {observe_ns:6.0f} ns | stage() span {span_ns:6.0f} ns")
+
+    app_main.outlet_store.install(generate_snapshot(args.outlets))
+    app_main.outlet_store.poll_interval = 3600
+    asyncio.run(compare(args.requests))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
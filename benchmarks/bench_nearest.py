@@ -0,0 +1,72 @@
+"""Benchmark GridIndex.nearest against a brute-force vectorized scan.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_nearest --sizes 1000 10000 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_snapshot, random_points
+from spatial import GridIndex, haversine_km
+
+BUDGET_MS = 1.0
+
+
+def brute_force(index: GridIndex, lat: float, lon: float, k: int):
+    dists = haversine_km(lat, lon, index.lats, index.lons)
+    top = np.argsort(dists, kind="stable")[:k]
+    return list(zip(index.ids[top].tolist(), dists[top].tolist()))
+
+
+def run(size: int, k: int, queries: int):
+    snapshot = generate_snapshot(size)
+    started = time.perf_counter()
+    index = GridIndex.from_outlets(snapshot.outlets)
+    build_ms = (time.perf_counter() - started) * 1000
+    points = random_points(queries)
+
+    for lat, lon in points[:50]:
+        expected = [d for _, d in brute_force(index, lat, lon, k)]
+        got = [d for _, d in index.nearest(lat, lon, k)]
+        assert np.allclose(expected, got), (lat, lon, expected, got)
+
+    def timed(fn):
+        samples = []
+        for lat, lon in points:
+            t0 = time.perf_counter()
+            fn(lat, lon)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+    grid_p50, grid_p99 = timed(lambda lat, lon: index.nearest(lat, lon, k))
+    brute_p50, brute_p99 = timed(lambda lat, lon: brute_force(index, lat, lon, k))
+    radius_p50, _ = timed(lambda lat, lon: index.nearest(lat, lon, k, radius_km=5.0))
+    print(f"{size:>8} outlets | build {build_ms:8.1f} ms | grid p50 {grid_p50:.3f} ms p99 {grid_p99:.3f} ms"
+          f" | grid+5km p50 {radius_p50:.3f} ms | brute p50 {brute_p50:.3f} ms p99 {brute_p99:.3f} ms")
+    return grid_p99
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for size in args.sizes:
+        p99 = run(size, args.k, args.queries)
+        if size <= 100000 and p99 > BUDGET_MS:
+            print(f"FAIL: p99 nearest() at {size} outlets is {p99:.3f} ms (budget {BUDGET_MS} ms)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Benchmark storing scraped outlets: commit per outlet and perk (old scraper) vs chunked executemany transactions.
+
+Both paths write into a fresh SQLite stand-in database (benchmarks/sqlite_db.py), with --latency-ms
+added to every statement to stand in for the round trip to MySQL. A nightly re-scrape is then
+replayed over the chunked database with --churn of the outlets edited, moved, closed or new.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_outlet_writer --outlets 1000 --latency-ms 0.5 --chunks 100 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.sqlite_db import connect_factory, create_database
+from benchmarks.synthetic import generate_rows
+from outlet_keys import perk_code
+from outlet_writer import OutletWriter
+
+
+def scraped_entries(count: int):
+    outlet_rows, perk_rows, link_rows = generate_rows(count)
+    names = {perk["id"]: perk["name"] for perk in perk_rows}
+    perks = {}
+    for link in link_rows:
+        perks.setdefault(link["outlet_id"], []).append(names[link["perk_id"]])
+    return [{"name": row["name"], "address": row["address"], "waze_link": row["waze_link"],
+             "perks": perks.get(row["id"], [])} for row in outlet_rows]
+
+
+def write_per_outlet(conn, entries):
+    """The old save_outlet_and_perks: a commit after the outlet, after each new perk and after the links"""
+    for entry in entries:
+        cur = conn.cursor()
+        cur.execute("INSERT INTO outlets (name, address, waze_link) VALUES (%s, %s, %s)",
+                    (entry['name'], entry['address'], entry['waze_link']))
+        conn.commit()
+        outlet_id = cur.lastrowid
+        perk_ids = []
+        for name in entry['perks']:
+            code = perk_code(name)
+            cur.execute("SELECT id FROM perks WHERE code=%s", (code,))
+            row = cur.fetchone()
+            if row:
+                perk_ids.append(row[0])
+            else:
+                cur.execute("INSERT INTO perks (code, name) VALUES (%s, %s)", (code, name.strip()))
+                conn.commit()
+                perk_ids.append(cur.lastrowid)
+        for perk_id in perk_ids:
+            cur.execute("INSERT INTO outlet_perks (outlet_id, perk_id) VALUES (%s, %s)", (outlet_id, perk_id))
+        conn.commit()
+        cur.close()
+
+
+def write_chunked(conn, entries, chunk_size: int):
+    writer = OutletWriter(conn, chunk_size)
+    with writer:
+        writer.write(entries)
+
+
+def rescraped(entries, churn: float, seed: int = 7):
+    """The next night's scrape: a share of outlets edited, moved, gone and new, split evenly"""
+    rng = random.Random(seed)
+    entries = [dict(entry) for entry in entries]
+    count = max(4, int(len(entries) * churn)) // 4
+    picked = rng.sample(range(len(entries)), count * 3)
+    for i in picked[:count]:
+        entries[i]["perks"] = entries[i]["perks"] + ["Free Parking"]
+    for i in picked[count:2 * count]:
+        entries[i]["address"] = "Lot 1, Jalan Baru, " + entries[i]["address"].split(", ", 2)[-1]
+    gone = set(picked[2 * count:])
+    entries = [entry for i, entry in enumerate(entries) if i not in gone]
+    entries += [{"name": f"McDonald's New Opening {n}", "address": f"Jalan Baru {n}", "waze_link": None,
+                 "perks": ["WiFi"]} for n in range(count)]
+    return entries
+
+
+def rescrape(path: str, entries, latency_ms: float):
+    conn = connect_factory(path, latency_ms)()
+    writer = OutletWriter(conn)
+    started = time.perf_counter()
+    with writer:
+        writer.write(entries)
+        writer.finish()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    print(f"  {'re-scrape':<18} {elapsed:8.2f} s | {len(entries) / elapsed:9.0f} outlets/s | {writer.report()}")
+    for line in writer.summary():
+        print(f"    {line[:100]}")
+    return writer.changes
+
+
+def stored(conn):
+    """Outlets with their perk codes, independent of the ids each path assigned"""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT o.name, o.address, o.waze_link, p.code
+          FROM outlets o
+          LEFT JOIN outlet_perks op ON op.outlet_id = o.id
+          LEFT JOIN perks p ON p.id = op.perk_id
+    """)
+    rows = sorted(cur.fetchall(), key=lambda row: tuple(str(value) for value in row))
+    cur.close()
+    return rows
+
+
+def run(label: str, write, entries, latency_ms: float, tmp: str):
+    path = os.path.join(tmp, f"{label.replace(' ', '-')}.db")
+    create_database(path, [], [], [])
+    conn = connect_factory(path, latency_ms)()
+    started = time.perf_counter()
+    write(conn, entries)
+    elapsed = time.perf_counter() - started
+    rows = stored(conn)
+    conn.close()
+    print(f"  {label:<18} {elapsed:8.2f} s | {len(entries) / elapsed:9.0f} outlets/s | {len(rows) / elapsed:9.0f} rows/s")
+    return path, rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.5, help="added to every statement")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--churn", type=float, default=0.04, help="share of outlets that change before the re-scrape")
+    args = parser.parse_args(argv)
+
+    entries = scraped_entries(args.outlets)
+    ok = True
+    with tempfile.TemporaryDirectory(prefix="bench-writer-") as tmp:
+        print(f"{args.outlets} outlets, {args.latency_ms} ms per statement")
+        _, expected = run("per outlet", write_per_outlet, entries, args.latency_ms, tmp)
+        for chunk in args.chunks:
+            path, rows = run(f"chunks of {chunk}", lambda conn, e: write_chunked(conn, e, chunk), entries,
+                             args.latency_ms, tmp)
+            if rows != expected:
+                print(f"  chunks of {chunk}: stored rows differ from the per-outlet path")
+                ok = False
+
+        # Replaying the same scrape must write nothing; the next night's only its delta.
+        unchanged = rescrape(path, entries, args.latency_ms)
+        if any(names for kind, names in unchanged.items() if kind != "unchanged"):
+            print("  re-scrape of identical data wrote changes")
+            ok = False
+        rescrape(path, rescraped(entries, args.churn), args.latency_ms)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
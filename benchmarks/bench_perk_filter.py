@@ -0,0 +1,96 @@
+"""Benchmark perk filtering and scoring: bitset index vs per-outlet set/substring checks.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_perk_filter --sizes 10000 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_snapshot
+from perk_index import PerkIndex
+
+# Service -> perk code groups as the chatbot's knowledge base maps them
+QUERIES = [
+    [["DRIVE_THRU"]],
+    [["24_HOURS"], ["MCCAFE"]],
+    [["WIFI"], ["BIRTHDAY_PARTY"], ["SURAU"]],
+    [["MCDELIVERY"], ["CASHLESS_FACILITY"], ["BREAKFAST"], ["DESSERT_CENTER"]],
+]
+
+
+def legacy_any_of(snapshot, codes):
+    wanted = set(codes)
+    return [outlet["id"] for outlet in snapshot.outlets if wanted & snapshot.perk_codes[outlet["id"]]]
+
+
+def legacy_all_of(snapshot, codes):
+    wanted = set(codes)
+    return [outlet["id"] for outlet in snapshot.outlets if wanted <= snapshot.perk_codes[outlet["id"]]]
+
+
+def legacy_score(snapshot, groups):
+    scores = []
+    for outlet in snapshot.outlets:
+        outlet_perks = outlet["perk_codes"] or ""
+        scores.append(sum(1 for group in groups if any(code in outlet_perks for code in group)))
+    return scores
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(size: int, repeat: int):
+    snapshot = generate_snapshot(size)
+    started = time.perf_counter()
+    index = PerkIndex.from_snapshot(snapshot)
+    build_ms = (time.perf_counter() - started) * 1000
+    ids = index.ids
+
+    for groups in QUERIES:
+        codes = [code for group in groups for code in group]
+        assert ids[index.any_of(codes)].tolist() == legacy_any_of(snapshot, codes)
+        assert ids[index.all_of(codes)].tolist() == legacy_all_of(snapshot, codes)
+        assert index.groups_matched(groups).tolist() == legacy_score(snapshot, groups)
+
+    def each_query(fn):
+        return lambda: [fn(groups, [code for group in groups for code in group]) for groups in QUERIES]
+
+    rows = {
+        "any-of": (each_query(lambda g, c: legacy_any_of(snapshot, c)),
+                   each_query(lambda g, c: np.flatnonzero(index.any_of(c)))),
+        "all-of": (each_query(lambda g, c: legacy_all_of(snapshot, c)),
+                   each_query(lambda g, c: np.flatnonzero(index.all_of(c)))),
+        "score": (each_query(lambda g, c: legacy_score(snapshot, g)),
+                  each_query(lambda g, c: index.groups_matched(g))),
+    }
+    print(f"{size:>8} outlets | index build {build_ms:8.1f} ms | {index.words.nbytes / 1024:.0f} KiB")
+    for name, (legacy, bitset) in rows.items():
+        legacy_ms = timed(legacy, repeat) / len(QUERIES)
+        bitset_ms = timed(bitset, repeat) / len(QUERIES)
+        print(f"{'':>8}  {name:<7} legacy {legacy_ms:8.3f} ms | bitset {bitset_ms:7.3f} ms"
+              f" | {legacy_ms / bitset_ms:6.1f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    for size in args.sizes:
+        run(size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Benchmark chat relevance ranking: precomputed keyword vectors + top-k vs per-outlet scoring + full sort.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ranking --sizes 10000 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import generate_snapshot
+from main import AgenticChatbot, TextProcessor
+from perk_index import get_perk_index
+from ranking import get_name_vectors
+from text_index import get_text_index
+
+QUERIES = [
+    "Which outlets in Bangsar have drive-thru?",
+    "McDonald's Mid Valley Mall with wifi",
+    "24 hours outlets around Jalan Ampang",
+    "birthday party at Petaling Jaya Square",
+    "Kuala Lumpur Central breakfast",
+]
+
+
+def legacy_rank(bot, snapshot, outlets, query, entities):
+    """The previous per-outlet loop: perk/location checks, name similarity, full sort"""
+    perk_index = get_perk_index(snapshot)
+    text_index = get_text_index(snapshot, TextProcessor.normalize_text)
+    groups = bot._service_perk_groups(entities)
+    hits = perk_index.groups_matched(groups, perk_index.rows_for(o["id"] for o in outlets)).tolist() if groups \
+        else [0] * len(outlets)
+    located = [text_index.containing("address", location) for location in entities["locations"]]
+    scored = []
+    for outlet, hit in zip(outlets, hits):
+        score = 0.8 * hit
+        score += 0.5 * sum(1 for ids in located if outlet["id"] in ids)
+        score += TextProcessor.calculate_similarity(query, outlet.get("name", "")) * 0.3
+        scored.append((outlet, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [outlet for outlet, _ in scored]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(bot, size: int, repeat: int, k: int):
+    snapshot = generate_snapshot(size)
+    started = time.perf_counter()
+    get_name_vectors(snapshot, TextProcessor.extract_keywords)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    cases = []
+    for query in QUERIES:
+        hits = bot._scan_query(query, snapshot)
+        entities = bot._extract_entities(query, hits)
+        # Rank every outlet: the worst case, e.g. a "list all" query.
+        cases.append((query, entities, snapshot.outlets))
+
+    for query, entities, outlets in cases:
+        expected = [o["id"] for o in legacy_rank(bot, snapshot, outlets, query, entities)]
+        ranked = [o["id"] for o in bot._rank_outlets_by_relevance(outlets, query, entities, snapshot)]
+        top = [o["id"] for o in bot._rank_outlets_by_relevance(outlets, query, entities, snapshot, limit=k)]
+        assert ranked == expected, query
+        assert top == expected[:k], query
+
+    def each(fn):
+        return lambda: [fn(query, entities, outlets) for query, entities, outlets in cases]
+
+    legacy_ms = timed(each(lambda q, e, o: legacy_rank(bot, snapshot, o, q, e)), repeat) / len(cases)
+    full_ms = timed(each(lambda q, e, o: bot._rank_outlets_by_relevance(o, q, e, snapshot)), repeat) / len(cases)
+    top_ms = timed(each(lambda q, e, o: bot._rank_outlets_by_relevance(o, q, e, snapshot, limit=k)), repeat) / len(cases)
+    print(f"{size:>8} outlets | vectors {build_ms:7.1f} ms | legacy {legacy_ms:8.2f} ms | vectorized full sort"
+          f" {full_ms:7.2f} ms ({legacy_ms / full_ms:.0f}x) | top-{k} {top_ms:6.2f} ms ({legacy_ms / top_ms:.0f}x)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args(argv)
+    bot = AgenticChatbot()
+    for size in args.sizes:
+        run(bot, size, args.repeat, args.k)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
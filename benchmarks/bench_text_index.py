@@ -0,0 +1,80 @@
+"""Benchmark address lookups through the trigram index vs a substring scan, and incremental rebuilds.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_text_index --sizes 10000 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import generate_rows
+from main import TextProcessor
+from outlet_store import OutletSnapshot
+from text_index import TextIndex
+
+LOCATIONS = ["bangsar", "kuala lumpur", "petaling jaya", "jalan ampang", "johor", "ss2", "mall", "cheras"]
+
+
+def scan(snapshot, location: str):
+    needle = location.lower()
+    return {outlet["id"] for outlet in snapshot.outlets if needle in (outlet["address"] or "").lower()}
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def edited(outlet_rows, fraction: float, seed: int = 7):
+    """Copy of the rows with a fraction of addresses rewritten, as a re-scrape would"""
+    rng = random.Random(seed)
+    rows = [dict(row) for row in outlet_rows]
+    for row in rng.sample(rows, int(len(rows) * fraction)):
+        row["address"] = f"Lot {rng.randint(1, 999)}, Jalan Baru {rng.randint(1, 99)}, {row['address'].split(', ')[-1]}"
+    return rows
+
+
+def run(size: int, repeat: int):
+    normalize = TextProcessor.normalize_text
+    outlet_rows, perk_rows, link_rows = generate_rows(size)
+    snapshot = OutletSnapshot.from_rows("v1", outlet_rows, perk_rows, link_rows)
+
+    started = time.perf_counter()
+    index = TextIndex.build(snapshot, normalize)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    changed = OutletSnapshot.from_rows("v2", edited(outlet_rows, 0.01), perk_rows, link_rows)
+    started = time.perf_counter()
+    incremental = index.updated(changed)
+    update_ms = (time.perf_counter() - started) * 1000
+    rebuilt = TextIndex.build(changed, normalize)
+    assert incremental.grams == rebuilt.grams
+
+    for location in LOCATIONS:
+        assert index.containing("address", location) == scan(snapshot, location), location
+
+    index_ms = timed(lambda: [index.containing("address", loc) for loc in LOCATIONS], repeat) / len(LOCATIONS)
+    scan_ms = timed(lambda: [scan(snapshot, loc) for loc in LOCATIONS], repeat) / len(LOCATIONS)
+    print(f"{size:>8} outlets | full build {build_ms:8.1f} ms | 1% changed update {update_ms:7.1f} ms"
+          f" | lookup index {index_ms:.3f} ms vs scan {scan_ms:.3f} ms ({scan_ms / index_ms:.1f}x)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    for size in args.sizes:
+        run(size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Benchmark Waze redirect resolution: sequential vs a bounded pool of workers vs a cached re-scrape.
+
+A local threaded HTTP server stands in for Waze. /r/<n> answers a 302 to /final/<n>
+after --latency-ms, and so does /final/<n> with a 200, so every link costs two round-trips.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_waze_resolve --outlets 200 --latency-ms 50 --workers 1 8 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from waze_links import WazeResolver
+
+
+def start_server(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.startswith("/r/"):
+                self.send_response(302)
+                self.send_header("Location", "/final/" + self.path[3:])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                body = b"<html>waze</html>"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(base: str, outlets: int, workers: int, cache_path: str):
+    items = [(f"outlet {n}", f"{base}/r/{n}") for n in range(outlets)]
+    expected = {key: f"{base}/final/{n}" for n, (key, _) in enumerate(items)}
+    resolver = WazeResolver(workers=workers, cache_path=cache_path)
+    try:
+        started = time.perf_counter()
+        links = resolver.resolve_all(items)
+        elapsed = time.perf_counter() - started
+    finally:
+        resolver.close()
+    ok = links == expected
+    print(f"  workers {workers:>3} | {elapsed:7.2f} s | {outlets / elapsed:8.1f} links/s | {resolver.stats}"
+          f"{'' if ok else ' | WRONG LINKS'}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args(argv)
+
+    server = start_server(args.latency_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    tmp = tempfile.mkdtemp(prefix="bench-waze-")
+    ok = True
+    try:
+        print(f"{args.outlets} outlets, {args.latency_ms:.0f} ms per hop, 2 hops per link")
+        for workers in args.workers:
+            # A fresh cache per run, so every run resolves every link.
+            ok = run(base, args.outlets, workers, os.path.join(tmp, f"cold-{workers}.json")) and ok
+        print("re-scrape with the cache from the last run:")
+        ok = run(base, args.outlets, args.workers[-1], os.path.join(tmp, f"cold-{args.workers[-1]}.json")) and ok
+    finally:
+        server.shutdown()
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""SQLite stand-in for the MySQL schema, pluggable into ConnectionPool(connect=...).
+
+Only what the app's queries need is emulated: %s placeholders, dictionary
+cursors, CRC32/CONCAT_WS for the snapshot version query and ping(). An optional
+per-statement latency simulates the network round trip to a real server.
+"""
+import sqlite3
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outlets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    outlet_key CHAR(40) UNIQUE,
+    content_hash CHAR(40),
+    name VARCHAR(255) NOT NULL,
+    address TEXT,
+    waze_link TEXT,
+    latitude DECIMAL(10, 8),
+    longitude DECIMAL(11, 8),
+    closed_at DATETIME
+);
+CREATE TABLE IF NOT EXISTS perks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code VARCHAR(100) UNIQUE NOT NULL,
+    name VARCHAR(255) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outlet_perks (
+    outlet_id INT NOT NULL,
+    perk_id INT NOT NULL,
+    PRIMARY KEY (outlet_id, perk_id),
+    FOREIGN KEY (outlet_id) REFERENCES outlets(id) ON DELETE CASCADE,
+    FOREIGN KEY (perk_id) REFERENCES perks(id) ON DELETE CASCADE
+);
+"""
+
+
+def _crc32(value) -> Optional[int]:
+    return None if value is None else zlib.crc32(str(value).encode())
+
+
+def _concat_ws(separator, *values) -> str:
+    return separator.join(str(value) for value in values if value is not None)
+
+
+def _translate(sql: str) -> str:
+    return sql.replace("%s", "?")
+
+
+class SQLiteCursor:
+    """DB-API cursor returning dicts (dictionary=True) or tuples, like mysql-connector"""
+
+    def __init__(self, conn: "SQLiteConnection", dictionary: bool):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, sql: str, params=()):
+        self._conn.simulate_latency()
+        self._cursor.execute(_translate(sql), tuple(params or ()))
+
+    def executemany(self, sql: str, seq_params):
+        self._conn.simulate_latency()
+        self._cursor.executemany(_translate(sql), [tuple(params) for params in seq_params])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self) -> List:
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Thin mysql-connector lookalike over a sqlite3 connection"""
+
+    def __init__(self, path: str, latency_ms: float = 0.0):
+        # The pool hands a connection to one thread at a time.
+        self.raw = sqlite3.connect(path, check_same_thread=False)
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        self.raw.create_function("CRC32", 1, _crc32, deterministic=True)
+        self.raw.create_function("CONCAT_WS", -1, _concat_ws, deterministic=True)
+        self.latency = latency_ms / 1000.0
+
+    def simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def cursor(self, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.raw.in_transaction
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect: bool = False):
+        self.raw.execute("SELECT 1")
+
+    def close(self):
+        self.raw.close()
+
+
+def connect_factory(path: str, latency_ms: float = 0.0) -> Callable[..., SQLiteConnection]:
+    """Return a connect(**db_config) callable for ConnectionPool that ignores the MySQL config"""
+    def connect(**_db_config) -> SQLiteConnection:
+        return SQLiteConnection(path, latency_ms)
+    return connect
+
+
+def create_database(path: str, outlet_rows: List[Dict], perk_rows: List[Dict], link_rows: List[Dict]):
+    """Create the schema at path and load rows shaped like benchmarks.synthetic.generate_rows()"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO outlets (id, name, address, waze_link, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?)",
+            [(r["id"], r["name"], r["address"], r["waze_link"], r["latitude"], r["longitude"]) for r in outlet_rows],
+        )
+        conn.executemany("INSERT INTO perks (id, code, name) VALUES (?, ?, ?)",
+                         [(p["id"], p["code"], p["name"]) for p in perk_rows])
+        conn.executemany("INSERT INTO outlet_perks (outlet_id, perk_id) VALUES (?, ?)",
+                         [(link["outlet_id"], link["perk_id"]) for link in link_rows])
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,276 @@
+"""End-to-end benchmark suite: synthetic datasets in SQLite, read routes driven through the ASGI app.
+
+For every dataset size a fresh process generates outlets/perks/outlet_perks
+(benchmarks/synthetic.py), loads them into the SQLite stand-in
+(benchmarks/sqlite_db.py), points the app's pool at it and drives each
+scenario through an in-process httpx ASGI client. Throughput, p50/p99 latency,
+snapshot load time and peak RSS are reported per size, and the run fails when a
+figure regresses past the tolerance against benchmarks/baseline.json.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                      # 1k, 10k, 100k against the baseline
+    python -m benchmarks.suite --sizes 1000000 --requests 100
+    python -m benchmarks.suite --update-baseline    # record this machine's figures
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+RESULT_PREFIX = "RESULT "
+RSS_TOLERANCE = 0.25  # memory is far steadier than timings
+P99_TOLERANCE_FACTOR = 2.0  # tail latency jitters more than the median, so it gets twice the slack
+
+QUESTIONS = [
+    "Which outlets in Bangsar have drive-thru?",
+    "Find 24 hours McDonald's in Petaling Jaya",
+    "Where can I get breakfast near Cheras?",
+    "Show me outlets with wifi in Kuala Lumpur",
+    "Any McCafe in Johor Bahru?",
+    "I need a place for a birthday party in Shah Alam",
+]
+SEARCHES = ["drive thru", "24 hours breakfast", "mccafe bangsar", "wifi petaling jaya"]
+
+Request = Tuple[str, str, Optional[Dict]]
+
+
+def _outlets_full(rng: random.Random, size: int, points) -> Request:
+    return "GET", "/outlets", None
+
+
+def _outlets_page(rng, size, points) -> Request:
+    return "GET", f"/outlets?after_id={rng.randint(0, max(0, size - 100))}&limit=100", None
+
+
+def _outlet_by_id(rng, size, points) -> Request:
+    return "GET", f"/outlets/{rng.randint(1, size)}", None
+
+
+def _nearest(rng, size, points) -> Request:
+    lat, lon = rng.choice(points)
+    return "GET", f"/outlets/nearest?lat={lat:.5f}&lon={lon:.5f}&k=5", None
+
+
+def _overlaps(rng, size, points) -> Request:
+    return "GET", f"/analytics/overlaps?radius_km={rng.choice([1, 2, 5])}", None
+
+
+def _chat(rng, size, points) -> Request:
+    return "POST", "/chat", {"question": rng.choice(QUESTIONS), "session_id": f"suite-{rng.randrange(100)}"}
+
+
+def _search(rng, size, points) -> Request:
+    return "GET", f"/search?q={rng.choice(SEARCHES).replace(' ', '+')}&k=10", None
+
+
+# (name, share of --requests, request builder); whole-table routes get fewer requests.
+SCENARIOS: List[Tuple[str, float, Callable[..., Request]]] = [
+    ("outlets_full", 0.05, _outlets_full),
+    ("outlets_page", 1.0, _outlets_page),
+    ("outlet_by_id", 1.0, _outlet_by_id),
+    ("nearest", 1.0, _nearest),
+    ("overlaps", 0.1, _overlaps),
+    ("chat", 1.0, _chat),
+    ("search", 1.0, _search),
+]
+
+
+# -----------------------------
+# WORKER (one process per size)
+# -----------------------------
+async def _drive(client, build: Callable[..., Request], requests: int, concurrency: int, size: int, points,
+                 seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    plan = [build(rng, size, points) for _ in range(requests)]
+    method, path, body = plan[0]
+    (await client.request(method, path, json=body)).raise_for_status()  # warm per-version caches
+
+    latencies: List[float] = []
+    pending = iter(plan)
+
+    async def worker():
+        for method, path, body in pending:
+            t0 = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 3),
+    }
+
+
+def run_worker(size: int, requests: int, concurrency: int, accept_encoding: str) -> Dict:
+    tmp = tempfile.mkdtemp(prefix="bench-suite-")
+    # Keep the persisted retrieval index out of the working tree; read when retrieval is imported.
+    os.environ["RETRIEVAL_INDEX_PATH"] = os.path.join(tmp, "retrieval_index.json.gz")
+
+    import httpx
+
+    import main as app_main
+    from benchmarks.sqlite_db import connect_factory, create_database
+    from benchmarks.synthetic import generate_rows, random_points
+    from db import ConnectionPool
+
+    started = time.perf_counter()
+    rows = generate_rows(size)
+    path = os.path.join(tmp, "outlets.db")
+    create_database(path, *rows)
+    del rows
+    dataset_s = time.perf_counter() - started
+
+    pool = ConnectionPool({}, size=8, connect=connect_factory(path))
+    app_main.db_pool = pool
+    app_main.outlet_store.pool = pool
+    app_main.outlet_store.poll_interval = 3600
+    started = time.perf_counter()
+    app_main.outlet_store.refresh(force=True)
+    load_s = time.perf_counter() - started
+
+    points = random_points(1000)
+    scenarios = {}
+
+    async def drive_all():
+        transport = httpx.ASGITransport(app=app_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None,
+                                     headers={"Accept-Encoding": accept_encoding}) as client:
+            for seed, (name, share, build) in enumerate(SCENARIOS):
+                count = max(concurrency, int(requests * share))
+                scenarios[name] = await _drive(client, build, count, concurrency, size, points, seed)
+
+    try:
+        asyncio.run(drive_all())
+    finally:
+        pool.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "size": size,
+        "dataset_s": round(dataset_s, 2),
+        "snapshot_load_s": round(load_s, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "scenarios": scenarios,
+    }
+
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+def run_size(size: int, requests: int, concurrency: int, accept_encoding: str) -> Dict:
+    command = [sys.executable, "-m", "benchmarks.suite", "--worker", str(size), "--requests", str(requests),
+               "--concurrency", str(concurrency), "--accept-encoding", accept_encoding]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"benchmark worker for {size} outlets failed (exit code {completed.returncode})")
+
+
+def report(result: Dict):
+    print(f"\n{result['size']:,} outlets | dataset {result['dataset_s']:.1f} s"
+          f" | snapshot load {result['snapshot_load_s']:.2f} s | peak RSS {result['peak_rss_mb']:.0f} MiB")
+    for name, stats in result["scenarios"].items():
+        print(f"  {name:<14} {stats['rps']:9.1f} req/s | p50 {stats['p50_ms']:8.2f} ms | p99 {stats['p99_ms']:8.2f} ms")
+
+
+def regressions(result: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Figures worse than the baseline by more than `tolerance` (1.0 = twice as bad)"""
+    base = baseline.get("results", {}).get(str(result["size"]))
+    if base is None:
+        print(f"  (no baseline for {result['size']} outlets)")
+        return []
+    failures = []
+    limit = 1.0 + tolerance
+    if result["peak_rss_mb"] > base["peak_rss_mb"] * (1.0 + RSS_TOLERANCE):
+        failures.append(f"{result['size']}: peak RSS {result['peak_rss_mb']} MiB > {base['peak_rss_mb']} MiB baseline")
+    if result["snapshot_load_s"] > base["snapshot_load_s"] * limit:
+        failures.append(f"{result['size']}: snapshot load {result['snapshot_load_s']} s > {base['snapshot_load_s']} s baseline")
+    for name, stats in result["scenarios"].items():
+        expected = base["scenarios"].get(name)
+        if expected is None:
+            continue
+        # Millisecond-scale latencies jitter by more than their own size, so small absolute changes never fail.
+        for key, allowed in (("p50_ms", limit), ("p99_ms", 1.0 + tolerance * P99_TOLERANCE_FACTOR)):
+            if stats[key] > expected[key] * allowed and stats[key] - expected[key] > min_delta_ms:
+                failures.append(f"{result['size']} {name}: {key[:3]} {stats[key]} ms > {expected[key]} ms baseline")
+        if stats["rps"] * limit < expected["rps"]:
+            failures.append(f"{result['size']} {name}: {stats['rps']} req/s < {expected['rps']} req/s baseline")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--requests", type=int, default=400, help="requests per scenario (scaled by its share)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--accept-encoding", default="identity",
+                        help="sent with every request; e.g. 'br, gzip' to include compression (and client decoding)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed slowdown before failing, 1.0 = 2x (p99 gets twice this)")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="p99 increases below this never fail")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(RESULT_PREFIX + json.dumps(run_worker(args.worker, args.requests, args.concurrency, args.accept_encoding)),
+              flush=True)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        settings = (baseline.get("requests"), baseline.get("concurrency"), baseline.get("accept_encoding"))
+        if settings != (args.requests, args.concurrency, args.accept_encoding):
+            print(f"Warning: baseline was recorded with --requests {settings[0]} --concurrency {settings[1]}"
+                  f" --accept-encoding '{settings[2]}'")
+
+    results, failures = [], []
+    for size in args.sizes:
+        result = run_size(size, args.requests, args.concurrency, args.accept_encoding)
+        report(result)
+        results.append(result)
+        if not args.update_baseline:
+            failures.extend(regressions(result, baseline, args.tolerance, args.min_delta_ms))
+
+    if args.update_baseline:
+        settings = {"requests": args.requests, "concurrency": args.concurrency, "accept_encoding": args.accept_encoding}
+        same = all(baseline.get(key) == value for key, value in settings.items())
+        recorded = baseline.get("results", {}) if same else {}
+        recorded.update({str(result["size"]): result for result in results})
+        with open(args.baseline, "w") as f:
+            json.dump(dict(settings, results=recorded), f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if failures:
+        print("\nFAIL: regressions against baseline")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nOK: no regressions against baseline" if baseline else "\nNo baseline recorded; run with --update-baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
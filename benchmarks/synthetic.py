@@ -0,0 +1,122 @@
+"""Synthetic McDonald's Malaysia outlet data for benchmarks."""
+import html
+import json
+import random
+from typing import Dict, List, Tuple
+
+from outlet_store import OutletSnapshot
+
+# (area, state, latitude, longitude, weight, spread in degrees)
+AREAS = [
+    ("Kuala Lumpur", "Wilayah Persekutuan", 3.1390, 101.6869, 20, 0.06),
+    ("Bukit Bintang", "Wilayah Persekutuan", 3.1466, 101.7100, 6, 0.01),
+    ("Bangsar", "Wilayah Persekutuan", 3.1300, 101.6790, 4, 0.01),
+    ("Cheras", "Wilayah Persekutuan", 3.0850, 101.7400, 5, 0.03),
+    ("Petaling Jaya", "Selangor", 3.1073, 101.6067, 10, 0.04),
+    ("Shah Alam", "Selangor", 3.0733, 101.5185, 8, 0.05),
+    ("Subang Jaya", "Selangor", 3.0565, 101.5851, 6, 0.03),
+    ("Klang", "Selangor", 3.0449, 101.4456, 5, 0.05),
+    ("Johor Bahru", "Johor", 1.4927, 103.7414, 9, 0.08),
+    ("George Town", "Pulau Pinang", 5.4141, 100.3288, 7, 0.05),
+    ("Ipoh", "Perak", 4.5975, 101.0901, 5, 0.05),
+    ("Melaka", "Melaka", 2.1896, 102.2501, 4, 0.05),
+    ("Seremban", "Negeri Sembilan", 2.7297, 101.9381, 3, 0.04),
+    ("Kuantan", "Pahang", 3.8077, 103.3260, 3, 0.05),
+    ("Kota Bharu", "Kelantan", 6.1254, 102.2381, 2, 0.04),
+    ("Alor Setar", "Kedah", 6.1248, 100.3678, 2, 0.04),
+    ("Kuching", "Sarawak", 1.5535, 110.3593, 4, 0.06),
+    ("Kota Kinabalu", "Sabah", 5.9804, 116.0735, 3, 0.06),
+]
+
+# (code, name, share of outlets offering it)
+PERKS = [
+    ("24_HOURS", "24 Hours", 0.45),
+    ("DRIVE_THRU", "Drive-Thru", 0.40),
+    ("MCCAFE", "McCafe", 0.35),
+    ("MCDELIVERY", "McDelivery", 0.70),
+    ("BREAKFAST", "Breakfast", 0.85),
+    ("WIFI", "WiFi", 0.60),
+    ("BIRTHDAY_PARTY", "Birthday Party", 0.20),
+    ("CASHLESS_FACILITY", "Cashless Facility", 0.75),
+    ("SURAU", "Surau", 0.30),
+    ("DESSERT_CENTER", "Dessert Center", 0.25),
+    ("DIGITAL_ORDER_KIOSK", "Digital Order Kiosk", 0.50),
+]
+
+STREETS = ["Jalan Ampang", "Jalan Tun Razak", "Jalan Sultan Ismail", "Jalan Bukit Bintang",
+           "Jalan Klang Lama", "Jalan Ipoh", "Persiaran Gurney", "Jalan Tebrau", "Lebuhraya Persekutuan",
+           "Jalan Maarof", "Jalan Cheras", "Jalan SS2/24", "Jalan Kuching", "Jalan Gaya"]
+MALLS = ["Mall", "Plaza", "Square", "Parade", "Central", "Avenue", "Point"]
+
+
+def generate_rows(count: int, seed: int = 42) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Return (outlet_rows, perk_rows, link_rows) shaped like the MySQL tables"""
+    rng = random.Random(seed)
+    weights = [area[4] for area in AREAS]
+    perk_rows = [{"id": i, "code": code, "name": name} for i, (code, name, _) in enumerate(PERKS, start=1)]
+
+    outlet_rows, link_rows = [], []
+    for outlet_id in range(1, count + 1):
+        area, state, lat, lon, _, spread = rng.choices(AREAS, weights)[0]
+        street = rng.choice(STREETS)
+        place = f"{area} {rng.choice(MALLS)}" if rng.random() < 0.4 else f"{street} {outlet_id % 97}"
+        postcode = rng.randint(10000, 98999)
+        outlet_rows.append({
+            "id": outlet_id,
+            "name": f"McDonald's {place}",
+            "address": f"Lot {rng.randint(1, 999)}, {street}, {postcode} {area}, {state}",
+            "waze_link": f"https://www.waze.com/ul?ll={lat:.5f},{lon:.5f}",
+            "latitude": round(rng.gauss(lat, spread), 8),
+            "longitude": round(rng.gauss(lon, spread), 8),
+        })
+        for perk, (_, _, share) in zip(perk_rows, PERKS):
+            if rng.random() < share:
+                link_rows.append({"outlet_id": outlet_id, "perk_id": perk["id"]})
+
+    return outlet_rows, perk_rows, link_rows
+
+
+def generate_snapshot(count: int, seed: int = 42) -> OutletSnapshot:
+    """Build an OutletSnapshot of `count` synthetic outlets"""
+    outlet_rows, perk_rows, link_rows = generate_rows(count, seed)
+    return OutletSnapshot.from_rows(f"synthetic-{count}-{seed}", outlet_rows, perk_rows, link_rows)
+
+
+def locate_page(count: int, seed: int = 42) -> str:
+    """A locate-us results page with `count` outlet cards, marked up like the live site"""
+    outlet_rows, perk_rows, link_rows = generate_rows(count, seed)
+    perk_names = {perk["id"]: perk["name"] for perk in perk_rows}
+    links: Dict[int, List[str]] = {}
+    for link in link_rows:
+        links.setdefault(link["outlet_id"], []).append(perk_names[link["perk_id"]])
+
+    cards = []
+    for row in outlet_rows:
+        json_ld = json.dumps({"@context": "https://schema.org", "@type": "Restaurant",
+                              "name": row["name"], "address": row["address"]})
+        perks = "".join(
+            f'<span class="ed-tooltip"><i class="icon-perk"></i><span class="ed-tooltiptext">{html.escape(name)}</span></span>'
+            for name in links.get(row["id"], [])
+        )
+        cards.append(
+            '<div class="columns large-3 medium-4 small-12"><div class="addressBox">'
+            f'<script type="application/ld+json">{json_ld}</script>'
+            f'<div class="addressTop">{perks}<span class="ed-tooltiptext">caret</span></div>'
+            f'<p class="addressText">{html.escape(row["address"])}</p>'
+            f'<a href="{html.escape(row["waze_link"])}&amp;navigate=yes" target="_blank">Waze</a>'
+            '</div></div>'
+        )
+    return ('<!DOCTYPE html><html><head><title>Locate Us</title></head><body><div class="row results">'
+            + "\n".join(cards)
+            + '</div><a class="btnLoadMore" style="display:none">Load More</a></body></html>')
+
+
+def random_points(count: int, seed: int = 7) -> List[Tuple[float, float]]:
+    """Query points drawn from the same area distribution as the outlets"""
+    rng = random.Random(seed)
+    weights = [area[4] for area in AREAS]
+    points = []
+    for _ in range(count):
+        _, _, lat, lon, _, spread = rng.choices(AREAS, weights)[0]
+        points.append((rng.gauss(lat, spread * 1.5), rng.gauss(lon, spread * 1.5)))
+    return points
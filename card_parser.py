@@ -0,0 +1,102 @@
+import json
+import re
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; fall back to one BeautifulSoup pass
+    lxml_html = None
+
+# -----------------------------
+# PARSER CONFIG
+# -----------------------------
+CARD_SELECTOR = 'div.columns.large-3.medium-4.small-12'
+PERK_SELECTOR = '.addressTop .ed-tooltiptext'
+PAGE_URL = 'https://www.mcdonalds.com.my/locate-us'
+WAZE_LINK_ATTRS = ('href', 'data-href', 'data-url', 'data-link')
+_URL_IN_SCRIPT = re.compile(r"""https?://[^'"\s)]+""")
+
+
+def _has_classes(*classes: str) -> str:
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes)
+
+
+CARD_XPATH = f"//div[{_has_classes('columns', 'large-3', 'medium-4', 'small-12')}]"
+JSON_LD_XPATH = ".//script[@type='application/ld+json']"
+PERK_XPATH = f".//*[{_has_classes('addressTop')}]//*[{_has_classes('ed-tooltiptext')}]"
+WAZE_XPATH = ".//a[contains(text(),'Waze')]"
+
+
+class OutletCard(NamedTuple):
+    """Fields of one result card on the locate-us page"""
+    name: Optional[str]
+    address: Optional[str]
+    perks: Tuple[str, ...]
+    waze_href: Optional[str]
+
+
+def parser_name() -> str:
+    return "lxml" if lxml_html is not None else "html.parser"
+
+
+def parse_cards(page: str) -> List[OutletCard]:
+    """Every result card in a page_source snapshot, in document order, from a single parse"""
+    if lxml_html is not None:
+        return _parse_lxml(page)
+    return _parse_soup(page)
+
+
+def waze_href(attrs: Mapping[str, str]) -> Optional[str]:
+    """Absolute link target of a Waze anchor from its href, data attributes or onclick handler"""
+    for name in WAZE_LINK_ATTRS:
+        value = (attrs.get(name) or '').strip()
+        if value and not value.startswith(('#', 'javascript:')):
+            return urljoin(PAGE_URL, value)
+    match = _URL_IN_SCRIPT.search(attrs.get('onclick') or '')
+    return match.group(0) if match else None
+
+
+def _card(json_ld: Optional[str], perk_texts, waze_attrs: Optional[Mapping[str, str]]) -> OutletCard:
+    name = address = None
+    if json_ld:
+        try:
+            data = json.loads(json_ld)
+            name, address = data.get('name'), data.get('address')
+        except ValueError as e:
+            print(f"[WARN] Could not parse outlet JSON-LD: {e}")
+    perks = tuple(text for text in perk_texts if text and 'caret' not in text.lower())
+    return OutletCard(name, address, perks, waze_href(waze_attrs) if waze_attrs is not None else None)
+
+
+def _parse_lxml(page: str) -> List[OutletCard]:
+    cards = []
+    for element in lxml_html.fromstring(page).xpath(CARD_XPATH):
+        scripts = element.xpath(JSON_LD_XPATH)
+        json_ld = scripts[0].text if scripts else None
+        # Same text as BeautifulSoup's get_text(strip=True): each string stripped, then joined.
+        perk_texts = ("".join(piece.strip() for piece in span.itertext()) for span in element.xpath(PERK_XPATH))
+        anchors = element.xpath(WAZE_XPATH)
+        cards.append(_card(json_ld, perk_texts, anchors[0].attrib if anchors else None))
+    return cards
+
+
+def _soup_waze_attrs(element) -> Optional[Mapping[str, str]]:
+    # Same anchors as WAZE_XPATH: 'Waze' in the anchor's first text node.
+    for anchor in element.find_all('a'):
+        text = next(iter(anchor.find_all(string=True, recursive=False)), '')
+        if 'Waze' in text:
+            return {name: value if isinstance(value, str) else ' '.join(value) for name, value in anchor.attrs.items()}
+    return None
+
+
+def _parse_soup(page: str) -> List[OutletCard]:
+    cards = []
+    for element in BeautifulSoup(page, 'html.parser').select(CARD_SELECTOR):
+        script = element.find('script', type='application/ld+json')
+        json_ld = script.string if script else None
+        perk_texts = (span.get_text(strip=True) for span in element.select(PERK_SELECTOR))
+        cards.append(_card(json_ld, perk_texts, _soup_waze_attrs(element)))
+    return cards
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import os
+import secrets
+from typing import Any, Tuple
+
+from response_cache import TTLCache
+
+# -----------------------------
+# CURSOR CONFIG
+# -----------------------------
+CHAT_CURSOR_ENTRIES = int(os.getenv("CHAT_CURSOR_ENTRIES", "4096"))
+CHAT_CURSOR_TTL_SECONDS = float(os.getenv("CHAT_CURSOR_TTL_SECONDS", "600"))
+# Continuation pages a cursor can reach; only their outlets are held, never the full result.
+CHAT_CURSOR_MAX_PAGES = int(os.getenv("CHAT_CURSOR_MAX_PAGES", "10"))
+
+
+class CursorExpired(Exception):
+    """The results a cursor points at are no longer held"""
+
+
+class CursorStore:
+    """Ranked chat results kept under random tokens; cursors are opaque (token, offset) strings"""
+
+    def __init__(self, max_entries: int = CHAT_CURSOR_ENTRIES, ttl: float = CHAT_CURSOR_TTL_SECONDS):
+        self._results = TTLCache(max_entries, ttl)
+
+    def issue(self, state: Any) -> str:
+        """Hold state and return the token that later cursors refer to"""
+        token = secrets.token_urlsafe(12)
+        self._results.put(token, state)
+        return token
+
+    @staticmethod
+    def encode(token: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{token}:{offset}".encode()).decode().rstrip("=")
+
+    def resume(self, cursor: str) -> Tuple[str, Any, int]:
+        """(token, state, offset) for a cursor; ValueError if malformed, CursorExpired if the state is gone"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            token, offset = raw.rsplit(":", 1)
+            offset = int(offset)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError("malformed cursor")
+        if offset < 0:
+            raise ValueError("malformed cursor")
+        state = self._results.get(token)
+        if state is None:
+            raise CursorExpired(cursor)
+        return token, state, offset
+
+    def stats(self):
+        return self._results.stats()
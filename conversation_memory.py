@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import Counter, OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+# -----------------------------
+# MEMORY CONFIG
+# -----------------------------
+MEMORY_CONFIG = {
+    "per_session": int(os.getenv("CHAT_MEMORY_PER_SESSION", "50")),
+    "max_sessions": int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", "10000")),
+    "max_entries": int(os.getenv("CHAT_MEMORY_MAX_ENTRIES", "100000")),
+}
+DEFAULT_SESSION = "default"
+RECENT_ENTRIES = 10
+STATS_MAX_KEYS = 1000   # distinct keys tracked per counter; the rest count as "(other)"
+OTHER_KEY = "(other)"
+
+
+class ConversationMemory:
+    """Per-session ring buffers under a global cap, with statistics maintained on insert"""
+
+    def __init__(self, per_session: int = MEMORY_CONFIG["per_session"],
+                 max_sessions: int = MEMORY_CONFIG["max_sessions"],
+                 max_entries: int = MEMORY_CONFIG["max_entries"]):
+        self.per_session = max(1, per_session)
+        self.max_sessions = max(1, max_sessions)
+        self.max_entries = max(1, max_entries)
+        self._sessions: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_ENTRIES)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.total_conversations = 0
+        self.evicted_sessions = 0
+        self.intent_stats: Counter = Counter()
+        self.location_stats: Counter = Counter()
+        self.service_stats: Counter = Counter()
+
+    def append(self, entry: Dict[str, Any], session_id: Optional[str] = None,
+               intent: Optional[str] = None, locations: Iterable[str] = (), services: Iterable[str] = ()):
+        """Record one conversation turn; O(1) apart from the entity lists it carries"""
+        session_id = session_id or DEFAULT_SESSION
+        entry = dict(entry, session_id=session_id, intent=intent)
+        with self._lock:
+            turns = self._sessions.get(session_id)
+            if turns is None:
+                turns = self._sessions[session_id] = deque(maxlen=self.per_session)
+            else:
+                self._sessions.move_to_end(session_id)
+            if len(turns) == turns.maxlen:
+                self._size -= 1
+            turns.append(entry)
+            self._size += 1
+            self._recent.append(entry)
+
+            self.total_conversations += 1
+            if intent:
+                self._count(self.intent_stats, intent)
+            for location in set(locations):
+                self._count(self.location_stats, location)
+            for service in set(services):
+                self._count(self.service_stats, service)
+
+            # Evict whole sessions, least recently active first, but never the one just written.
+            while (len(self._sessions) > self.max_sessions or self._size > self.max_entries) \
+                    and len(self._sessions) > 1:
+                _, evicted = self._sessions.popitem(last=False)
+                self._size -= len(evicted)
+                self.evicted_sessions += 1
+
+    @staticmethod
+    def _count(counter: Counter, key: str):
+        if key in counter or len(counter) < STATS_MAX_KEYS:
+            counter[key] += 1
+        else:
+            counter[OTHER_KEY] += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def session(self, session_id: str) -> List[Dict[str, Any]]:
+        """Turns remembered for one session, oldest first"""
+        with self._lock:
+            return list(self._sessions.get(session_id, ()))
+
+    def recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._recent)
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        """Counters and sizes; cost does not depend on how many turns were recorded"""
+        with self._lock:
+            return {
+                "total_conversations": self.total_conversations,
+                "memory_size": self._size,
+                "sessions": len(self._sessions),
+                "evicted_sessions": self.evicted_sessions,
+                "limits": {
+                    "per_session": self.per_session,
+                    "max_sessions": self.max_sessions,
+                    "max_entries": self.max_entries,
+                },
+                "intent_stats": dict(self.intent_stats.most_common(top)),
+                "location_stats": dict(self.location_stats.most_common(top)),
+                "service_stats": dict(self.service_stats.most_common(top)),
+            }
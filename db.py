@@ -0,0 +1,321 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import mysql.connector
+
+from metrics import DB_QUERY_ERRORS, observe_query, sql_shape
+
+# -----------------------------
+# POOL CONFIG
+# -----------------------------
+POOL_CONFIG = {
+    "size": int(os.getenv("DB_POOL_SIZE", "8")),
+    "checkout_timeout": float(os.getenv("DB_POOL_TIMEOUT", "5.0")),
+    "validate_after": float(os.getenv("DB_POOL_VALIDATE_AFTER", "30.0")),
+    "recycle": float(os.getenv("DB_POOL_RECYCLE", "3600.0")),
+}
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time"""
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw DB-API connection"""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class _Waiter:
+    """A caller blocked in acquire(), served in FIFO order"""
+
+    __slots__ = ("event", "handoff")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.handoff = None
+
+
+# Handoff markers: "open a fresh connection in the slot you were given" and
+# "the pool was closed while you were waiting".
+_OPEN_NEW = object()
+_CLOSED = object()
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of database connections with usage statistics"""
+
+    def __init__(
+        self,
+        db_config: Dict[str, Any],
+        size: int = POOL_CONFIG["size"],
+        checkout_timeout: float = POOL_CONFIG["checkout_timeout"],
+        validate_after: float = POOL_CONFIG["validate_after"],
+        recycle: float = POOL_CONFIG["recycle"],
+        connect: Optional[Callable[..., Any]] = None,
+    ):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.db_config = dict(db_config)
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.validate_after = validate_after
+        self.recycle = recycle
+        self._connect = connect or mysql.connector.connect
+        self._idle: List[_PooledConnection] = []
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "checkout_time_total": 0.0,
+            "checkout_time_max": 0.0,
+        }
+
+    # ----- checkout / checkin -----
+    def acquire(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """Check a connection out of the pool, opening one if below capacity"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        waited = False
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            if not self._waiters and self._idle:
+                pooled = self._idle.pop()
+            elif not self._waiters and self._open < self.size:
+                pooled = _OPEN_NEW
+                self._open += 1
+            else:
+                # Queue up behind earlier callers so a burst cannot starve them.
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                waited = True
+                pooled = None
+            if pooled is not None:
+                self._in_use += 1
+
+        if pooled is None:
+            waiter.event.wait(timeout)
+            with self._lock:
+                if waiter.handoff is None:
+                    self._waiters.remove(waiter)
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {timeout:.1f}s waiting for a database connection "
+                        f"(pool size {self.size})"
+                    )
+                pooled = waiter.handoff
+                self._in_use += 1
+            if pooled is _CLOSED:
+                with self._lock:
+                    self._in_use -= 1
+                raise RuntimeError("connection pool is closed")
+
+        try:
+            if pooled is _OPEN_NEW:
+                pooled = self._new_connection()
+            elif not self._is_usable(pooled):
+                self._discard(pooled)
+                pooled = self._new_connection()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._open -= 1
+                self._wake_next_waiter()
+            raise
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["waits"] += int(waited)
+            self._stats["checkout_time_total"] += elapsed
+            self._stats["checkout_time_max"] = max(self._stats["checkout_time_max"], elapsed)
+        return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False):
+        """Return a connection to the pool, ending any open transaction"""
+        if not discard:
+            try:
+                if pooled.raw.in_transaction:
+                    pooled.raw.rollback()
+            except Exception:
+                discard = True
+        discard = discard or self._closed
+
+        with self._lock:
+            self._in_use -= 1
+            if discard:
+                self._open -= 1
+                self._wake_next_waiter()
+            elif self._waiters:
+                pooled.last_used = time.monotonic()
+                self._hand_off(self._waiters.popleft(), pooled)
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+
+        if discard:
+            self._discard(pooled)
+
+    def _wake_next_waiter(self):
+        """Give a freed capacity slot to the oldest waiter (lock must be held)"""
+        if self._waiters and self._open < self.size:
+            self._open += 1
+            self._hand_off(self._waiters.popleft(), _OPEN_NEW)
+
+    @staticmethod
+    def _hand_off(waiter: "_Waiter", pooled):
+        waiter.handoff = pooled
+        waiter.event.set()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager yielding a raw connection checked out from the pool"""
+        pooled = self.acquire(timeout)
+        broken = False
+        try:
+            yield pooled.raw
+        except Exception:
+            broken = not self._alive(pooled.raw)
+            raise
+        finally:
+            self.release(pooled, discard=broken)
+
+    async def run_async(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run blocking DB work off the event loop, at most `size` calls at a time"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # One worker per connection: extra callers queue here rather
+                    # than tying up threads that would only wait in acquire().
+                    self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="db-pool")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    # ----- validation -----
+    def _new_connection(self) -> _PooledConnection:
+        pooled = _PooledConnection(self._connect(**self.db_config))
+        with self._lock:
+            self._stats["created"] += 1
+        return pooled
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if self.recycle and now - pooled.created_at > self.recycle:
+            return False
+        if now - pooled.last_used > self.validate_after:
+            return self._alive(pooled.raw)
+        return True
+
+    @staticmethod
+    def _alive(raw) -> bool:
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: _PooledConnection):
+        self._close_raw(pooled)
+        with self._lock:
+            self._stats["discarded"] += 1
+
+    @staticmethod
+    def _close_raw(pooled: _PooledConnection):
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+    # ----- lifecycle / stats -----
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            while self._waiters:
+                self._hand_off(self._waiters.popleft(), _CLOSED)
+        for pooled in idle:
+            self._close_raw(pooled)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            checkouts = self._stats["checkouts"]
+            return {
+                "size": self.size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "created": self._stats["created"],
+                "discarded": self._stats["discarded"],
+                "checkouts": checkouts,
+                "waits": self._stats["waits"],
+                "timeouts": self._stats["timeouts"],
+                "avg_checkout_ms": round(self._stats["checkout_time_total"] / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_checkout_ms": round(self._stats["checkout_time_max"] * 1000, 3),
+            }
+
+
+def fetch_all(cursor, sql: str, params=()) -> List[Any]:
+    """Execute a statement and fetch every row, recording time and row count under its SQL shape"""
+    started = time.perf_counter()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    except Exception:
+        DB_QUERY_ERRORS.inc(sql_shape(sql))
+        raise
+    observe_query(sql, time.perf_counter() - started, len(rows))
+    return rows
+
+
+# -----------------------------
+# SHARED POOLS
+# -----------------------------
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config: Dict[str, Any], **options) -> ConnectionPool:
+    """Return the process-wide pool for a DB config, creating it on first use"""
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_config, **options)
+            _pools[key] = pool
+        return pool
+
+
+def close_pools():
+    """Close every pool created through get_pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+# -----------------------------
+# COMPRESSION CONFIG
+# -----------------------------
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+BODY_CACHE_ENTRIES = 256
+BODY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_etag(*parts) -> str:
+    """Short, stable hash of the values a representation depends on"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return digest[:20]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring brotli"""
+    offered = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """LRU of encoded response bodies keyed by (etag, content-coding)"""
+
+    def __init__(self, max_entries: int = BODY_CACHE_ENTRIES, max_bytes: int = BODY_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str, encoding: Optional[str], render: Callable[[], bytes]) -> bytes:
+        """Return the body for etag in the given coding, rendering and compressing at most once"""
+        key = (etag, encoding)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        if encoding is None:
+            body = render()
+        else:
+            body = _compress(self.get(etag, None, render), encoding)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return body
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+body_cache = CompressedBodyCache()
+
+
+def validator_headers(etag: str, last_modified: float) -> Dict[str, str]:
+    return {
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept, Accept-Encoding",
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+        # Encoded variants share the identity tag's prefix; any of them validates.
+        return any(tag.split("-", 1)[0] == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: float) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def cached_response(request: Request, etag: str, last_modified: float, render: Callable[[], bytes],
+                    media_type: str = "application/json", headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve a cacheable body with validators, answering 304 or a precompressed variant"""
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    body = body_cache.get(etag, None, render)
+    if encoding is not None and len(body) >= MIN_COMPRESS_BYTES:
+        body = body_cache.get(etag, encoding, render)
+    else:
+        encoding = None
+
+    response_headers = validator_headers(etag, last_modified)
+    if encoding is not None:
+        response_headers["ETag"] = f'"{etag}-{encoding}"'
+        response_headers["Content-Encoding"] = encoding
+    response_headers.update(headers or {})
+    return Response(content=body, media_type=media_type, headers=response_headers)
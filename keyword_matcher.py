@@ -0,0 +1,78 @@
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def is_word_bounded(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] sits between regex \\b word boundaries"""
+    def is_word(index: int) -> bool:
+        return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+    return (is_word(start) != is_word(start - 1)) and (is_word(end - 1) != is_word(end))
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton reporting every occurrence of every pattern in one pass"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        self.payloads: List[Any] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[int, int], ...]] = [()]
+
+        for text, payload in patterns:
+            if not text:
+                continue
+            state = 0
+            for char in text:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][char] = nxt
+                state = nxt
+            self._out[state] += ((len(text), len(self.payloads)),)
+            self.payloads.append(payload)
+        self._link()
+
+    def _link(self):
+        """Compute failure links, then fold them into a full transition table"""
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit the outputs of the longest proper suffix that is a pattern.
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+        # In BFS order every failure state is complete before its dependants, so
+        # scanning needs one dict lookup per character and no failure walks.
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        for state in order:
+            delta = dict(self._delta[self._fail[state]])
+            delta.update(self._goto[state])
+            self._delta[state] = delta
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def scan(self, text: str) -> List[Tuple[int, int, Any]]:
+        """(start, end, payload) for every pattern occurrence, ordered by end position"""
+        delta, out, payloads = self._delta, self._out, self.payloads
+        hits = []
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if out[state]:
+                end = position + 1
+                for length, index in out[state]:
+                    hits.append((end - length, end, payloads[index]))
+        return hits
@@ -1,11 +1,10 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Tuple
-import mysql.connector
+import numpy as np
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 import re
-from fastapi.responses import FileResponse
 import os
 import math
 import json
@@ -13,6 +12,20 @@ from datetime import datetime
 from collections import defaultdict, Counter
 import unicodedata
 
+from chat_cursor import CHAT_CURSOR_MAX_PAGES, CursorExpired, CursorStore
+from conversation_memory import ConversationMemory
+from db import close_pools, fetch_all, get_pool
+from http_cache import cached_response, is_not_modified, make_etag, not_modified_response, validator_headers
+from keyword_matcher import KeywordMatcher, is_word_bounded
+from metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_latest, stage
+from outlet_store import OutletStore
+from perk_index import get_perk_index
+from ranking import get_name_vectors, top_k
+from response_cache import TTLCache
+from retrieval import Retriever
+from spatial import get_overlaps, get_spatial_index
+from text_index import get_text_index
+
 # -----------------------------
 # DATABASE CONFIG
 # -----------------------------
@@ -23,18 +36,17 @@ DB_CONFIG = {
     "database": "mcd_kualalumpur"
 }
 
-def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+db_pool = get_pool(DB_CONFIG)
+outlet_store = OutletStore(db_pool)
 
 def query_db(sql: str, params=()) -> List[Dict]:
-    """Execute database query and return results"""
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(sql, params)
-    result = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return result
+    """Execute database query on a pooled connection and return results"""
+    with db_pool.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            return fetch_all(cursor, sql, params)
+        finally:
+            cursor.close()
 
 # -----------------------------
 # FASTAPI APP
@@ -45,6 +57,7 @@ app = FastAPI(
     description="Advanced AI-powered McDonald's outlet finder with RAG and NLP capabilities."
 )
 
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -65,10 +78,16 @@ class Outlet(BaseModel):
     longitude: Optional[float]
     perks: Optional[List[str]] = []
 
+class NearbyOutlet(Outlet):
+    distance_km: float
+
 class ChatRequest(BaseModel):
     question: str
     user_location: Optional[str] = None
     context: Optional[Dict] = None
+    session_id: Optional[str] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
 
 class ChatResponse(BaseModel):
     answer: str
@@ -77,6 +96,12 @@ class ChatResponse(BaseModel):
     confidence: float
     reasoning: Optional[str] = None
     suggested_actions: Optional[List[str]] = None
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+CHAT_STREAM_CHUNK = int(os.getenv("CHAT_STREAM_CHUNK", "50"))
+CHAT_RESULT_LIMIT = int(os.getenv("CHAT_RESULT_LIMIT", "10"))
+CHAT_RESULT_MAX = int(os.getenv("CHAT_RESULT_MAX", "500"))
 
 # -----------------------------
 # NLP & RAG UTILITIES
@@ -92,6 +117,11 @@ class TextProcessor:
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
     
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Normalized word tokens, stopwords included (BM25 weighs them down itself)"""
+        return TextProcessor.normalize_text(text).split()
+    
     @staticmethod
     def extract_keywords(text: str) -> List[str]:
         """Extract important keywords from text"""
@@ -184,17 +214,14 @@ class KnowledgeBase:
                 'perk_codes': ['SURAU']
             }
         }
+        self.available_perks = {}
         self._build_knowledge_vectors()
-        self._load_perks_from_db()
+        self.retriever = Retriever(TextProcessor.tokenize)
+        self.retriever.sync(self.retrieval_documents())
     
-    def _load_perks_from_db(self):
-        """Load available perks from database to update knowledge base"""
-        try:
-            perks = query_db("SELECT id, code, name FROM perks")
-            self.available_perks = {perk['code']: perk for perk in perks}
-        except Exception as e:
-            print(f"Warning: Could not load perks from database: {e}")
-            self.available_perks = {}
+    def load_perks(self, snapshot):
+        """Take available perks from each installed snapshot, so they recover once the database answers"""
+        self.available_perks = {perk['code']: perk for perk in snapshot.perks}
     
     def _build_knowledge_vectors(self):
         """Build knowledge vectors for semantic search"""
@@ -214,23 +241,32 @@ class KnowledgeBase:
         return vector
     
     def search_knowledge(self, query: str) -> List[Tuple[str, float]]:
-        """Search knowledge base using semantic similarity"""
-        query_keywords = TextProcessor.extract_keywords(query)
-        results = []
-        
-        for service, knowledge in self.knowledge_vectors.items():
-            score = 0.0
-            for keyword in query_keywords:
-                if keyword in knowledge['vector']:
-                    score += knowledge['vector'][keyword]
-            
-            if query_keywords:
-                score = score / len(query_keywords)
-            
-            if score > 0:
-                results.append((service, score))
-        
-        return sorted(results, key=lambda x: x[1], reverse=True)
+        """Search knowledge base using BM25 over the service documents"""
+        hits = self.retriever.search(query, k=len(self.service_knowledge), kind='service')
+        return [(doc_id.split(':', 1)[1], score) for doc_id, score in hits]
+    
+    def retrieval_documents(self, snapshot=None) -> Dict[str, Tuple[str, str]]:
+        """{doc_id: (kind, text)} for services, perks and outlets"""
+        documents = {}
+        for service, info in self.service_knowledge.items():
+            text = f"{service.replace('_', ' ')} {info['description']} {' '.join(info['keywords'])}"
+            documents[f"service:{service}"] = ('service', text)
+        if snapshot is not None:
+            for perk in snapshot.perks:
+                documents[f"perk:{perk['code']}"] = ('perk', f"{perk['name']} {perk['code'].replace('_', ' ')}")
+            for outlet in snapshot.outlets:
+                documents[f"outlet:{outlet['id']}"] = ('outlet', f"{outlet['name']} {outlet['address'] or ''}")
+        return documents
+    
+    def sync_retriever(self, snapshot=None):
+        """Bring the BM25 index in line with a snapshot, persisting it when anything changed"""
+        changes = self.retriever.sync(self.retrieval_documents(snapshot))
+        if snapshot is not None and (changes['added'] or changes['updated'] or changes['removed']):
+            try:
+                self.retriever.save()
+            except OSError as e:
+                print(f"Warning: Could not save retrieval index: {e}")
+        return changes
 
 class AgenticChatbot:
     """Agentic AI chatbot with reasoning capabilities"""
@@ -238,16 +274,120 @@ class AgenticChatbot:
     def __init__(self):
         self.text_processor = TextProcessor()
         self.knowledge_base = KnowledgeBase()
-        self.conversation_memory = []
+        self.conversation_memory = ConversationMemory()
         self.intent_weights = {
             'location_search': 0.3,
             'service_inquiry': 0.4,
             'general_info': 0.2,
             'navigation': 0.1
         }
+        self._base_matcher = None
+        self.response_cache = TTLCache()
+        self.cursors = CursorStore()
     
-    def _extract_entities(self, text: str) -> Dict[str, List[str]]:
+    # Fixed location names, one list per legacy `\b(a|b|...)\b` pattern, in alternation order
+    LOCATION_NAME_GROUPS = [
+        ['kuala lumpur', 'kl', 'klcc', 'bukit bintang', 'pavilion', 'mid valley', 'bangsar', 'mont kiara'],
+        ['petaling jaya', 'pj', 'subang', 'shah alam', 'damansara', 'cheras', 'ampang'],
+    ]
+    INTENT_PHRASES = {
+        'list_all': ['list all', 'show all', 'all outlets', 'all locations', 'every outlet', 'complete list'],
+        'service_inquiry': [
+            'allows', 'allow', 'support', 'supports', 'offer', 'offers', 'provide', 'provides', 
+            'have', 'has', 'available', 'can i', 'do you', 'which', 'what', 'where can i'
+        ],
+        'location': ['where', 'nearest', 'closest', 'find', 'locate', 'address'],
+        'navigation': ['direction', 'how to get', 'way to', 'navigate', 'route'],
+        'general': ['list', 'show', 'tell me about', 'information'],
+    }
+    TIME_OF_DAY = ['morning', 'afternoon', 'evening', 'night']
+    PREPOSITION_PATTERN = re.compile(r'\b(?:in|at|near|around)\s+([a-z\s]+?)(?:\s|$|,|\?|!)')
+    CLOCK_PATTERN = re.compile(r'\b(\d{1,2})\s*(?:am|pm)\b')
+    NUMBER_PATTERN = re.compile(r'\b(\d+)\b')
+    POSTCODE_LOCALITY = re.compile(r'\b\d{5}\s+([^,\d]+)')
+    
+    def _static_patterns(self) -> List[Tuple[str, Tuple]]:
+        """Matcher patterns that do not depend on outlet data"""
+        patterns = []
+        for service, info in self.knowledge_base.service_knowledge.items():
+            for keyword in info['keywords']:
+                patterns.append((keyword, ('service', service)))
+        for group, phrases in self.INTENT_PHRASES.items():
+            for phrase in phrases:
+                patterns.append((phrase, ('intent', group)))
+        for group, names in enumerate(self.LOCATION_NAME_GROUPS):
+            for order, name in enumerate(names):
+                patterns.append((name, ('location', group, order)))
+        for alias in self.knowledge_base.location_aliases:
+            patterns.append((alias, ('place',)))
+        for word in self.TIME_OF_DAY:
+            patterns.append((word, ('time',)))
+        for digit in '0123456789':
+            patterns.append((digit, ('digit',)))
+        return patterns
+    
+    def _entity_matcher(self, snapshot=None) -> KeywordMatcher:
+        """Matcher over the static patterns plus localities found in outlet addresses"""
+        if snapshot is None:
+            if self._base_matcher is None:
+                self._base_matcher = KeywordMatcher(self._static_patterns())
+            return self._base_matcher
+        
+        def build(snap) -> KeywordMatcher:
+            localities = set()
+            for outlet in snap.outlets:
+                for locality in self.POSTCODE_LOCALITY.findall(outlet['address'] or ''):
+                    localities.add(locality.strip().lower())
+            return KeywordMatcher(self._static_patterns() + [(name, ('place',)) for name in sorted(localities)])
+        
+        return snapshot.derived('entity_matcher', build)
+    
+    def _scan_query(self, text: str, snapshot=None) -> Dict[str, Any]:
+        """Find every service keyword, intent phrase and location name in one pass over the query"""
+        text_lower = text.lower()
+        services, intents = set(), set()
+        location_hits = [[] for _ in self.LOCATION_NAME_GROUPS]
+        places, times = [], []
+        has_digits = False
+        
+        for start, end, payload in self._entity_matcher(snapshot).scan(text_lower):
+            kind = payload[0]
+            if kind == 'service':
+                services.add(payload[1])
+            elif kind == 'intent':
+                intents.add(payload[1])
+            elif kind == 'digit':
+                has_digits = True
+            elif is_word_bounded(text_lower, start, end):
+                if kind == 'location':
+                    location_hits[payload[1]].append((start, payload[2], end))
+                elif kind == 'time':
+                    times.append((start, end))
+                else:
+                    places.append((start, end))
+        
+        # Replay regex findall: leftmost match first, earliest alternative wins, no overlaps.
+        locations = []
+        for hits in location_hits:
+            position = 0
+            for start, _, end in sorted(hits):
+                if start >= position:
+                    locations.append(text_lower[start:end])
+                    position = end
+        
+        return {
+            'services': services,
+            'intents': intents,
+            'locations': locations,
+            'places': [text_lower[start:end] for start, end in sorted(places)],
+            'times': [text_lower[start:end] for start, end in sorted(times)],
+            'has_digits': has_digits,
+        }
+    
+    def _extract_entities(self, text: str, hits: Optional[Dict[str, Any]] = None) -> Dict[str, List[str]]:
         """Extract entities from user input"""
+        if hits is None:
+            hits = self._scan_query(text)
         entities = {
             'locations': [],
             'services': [],
@@ -255,41 +395,35 @@ class AgenticChatbot:
             'numbers': []
         }
         
-        location_patterns = [
-            r'\b(?:in|at|near|around)\s+([a-z\s]+?)(?:\s|$|,|\?|!)',
-            r'\b(kuala lumpur|kl|klcc|bukit bintang|pavilion|mid valley|bangsar|mont kiara)\b',
-            r'\b(petaling jaya|pj|subang|shah alam|damansara|cheras|ampang)\b'
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text.lower())
-            entities['locations'].extend([m.strip() for m in matches if m.strip()])
-        
         text_lower = text.lower()
-        for service, info in self.knowledge_base.service_knowledge.items():
-            for keyword in info['keywords']:
-                if keyword in text_lower:
-                    entities['services'].append(service)
-                    break  
+        entities['locations'].extend(
+            m.strip() for m in self.PREPOSITION_PATTERN.findall(text_lower) if m.strip()
+        )
+        entities['locations'].extend(hits['locations'])
+        for place in hits['places']:
+            if place not in entities['locations']:
+                entities['locations'].append(place)
         
-        time_patterns = [r'\b(\d{1,2})\s*(?:am|pm)\b', r'\b(morning|afternoon|evening|night)\b']
-        for pattern in time_patterns:
-            matches = re.findall(pattern, text.lower())
-            entities['time_references'].extend(matches)
+        entities['services'] = [
+            service for service in self.knowledge_base.service_knowledge if service in hits['services']
+        ]
         
-        number_matches = re.findall(r'\b(\d+)\b', text)
-        entities['numbers'] = [int(n) for n in number_matches]
+        if hits['has_digits']:
+            entities['time_references'].extend(self.CLOCK_PATTERN.findall(text_lower))
+            entities['numbers'] = [int(n) for n in self.NUMBER_PATTERN.findall(text)]
+        entities['time_references'].extend(hits['times'])
         
         return entities
     
-    def _reason_about_intent(self, query: str, entities: Dict) -> Tuple[str, float, str]:
+    def _reason_about_intent(self, query: str, entities: Dict, hits: Optional[Dict[str, Any]] = None) -> Tuple[str, float, str]:
         """Advanced reasoning to determine user intent"""
+        if hits is None:
+            hits = self._scan_query(query)
+        intents = hits['intents']
         reasoning_steps = []
         intent_scores = defaultdict(float)
-        query_lower = query.lower()
         
-        list_all_patterns = ['list all', 'show all', 'all outlets', 'all locations', 'every outlet', 'complete list']
-        if any(pattern in query_lower for pattern in list_all_patterns):
+        if 'list_all' in intents:
             intent_scores['general_info'] += 0.9
             reasoning_steps.append("Detected 'list all' request - overriding other intents")
             return 'general_info', 0.9, " | ".join(reasoning_steps)
@@ -298,11 +432,7 @@ class AgenticChatbot:
             intent_scores['service_inquiry'] += 0.8 
             reasoning_steps.append(f"Detected service keywords: {entities['services']}")
         
-        service_inquiry_keywords = [
-            'allows', 'allow', 'support', 'supports', 'offer', 'offers', 'provide', 'provides', 
-            'have', 'has', 'available', 'can i', 'do you', 'which', 'what', 'where can i'
-        ]
-        if any(kw in query_lower for kw in service_inquiry_keywords):
+        if 'service_inquiry' in intents:
             intent_scores['service_inquiry'] += 0.6
             reasoning_steps.append("Found service inquiry keywords")
         
@@ -314,18 +444,15 @@ class AgenticChatbot:
             intent_scores['service_inquiry'] += 0.3
             reasoning_steps.append(f"Detected time references: {entities['time_references']}")
         
-        location_keywords = ['where', 'nearest', 'closest', 'find', 'locate', 'address']
-        if any(kw in query_lower for kw in location_keywords) and not entities['services']:
+        if 'location' in intents and not entities['services']:
             intent_scores['location_search'] += 0.5
             reasoning_steps.append("Found location search keywords")
         
-        nav_keywords = ['direction', 'how to get', 'way to', 'navigate', 'route']
-        if any(kw in query_lower for kw in nav_keywords):
+        if 'navigation' in intents:
             intent_scores['navigation'] += 0.7
             reasoning_steps.append("Found navigation keywords")
         
-        general_keywords = ['list', 'show', 'tell me about', 'information']
-        if any(kw in query_lower for kw in general_keywords) and not entities['services']:
+        if 'general' in intents and not entities['services']:
             intent_scores['general_info'] += 0.4
             reasoning_steps.append("Found general information keywords")
         
@@ -338,84 +465,81 @@ class AgenticChatbot:
         
         return best_intent, confidence, reasoning
     
-    def _generate_sql_query(self, intent: str, entities: Dict) -> Tuple[str, tuple]:
-        """Generate appropriate SQL query based on intent and entities"""
-        base_query = """
-            SELECT DISTINCT 
-                o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude,
-                GROUP_CONCAT(p.code) as perk_codes,
-                GROUP_CONCAT(p.name) as perk_names
-            FROM outlets o
-            LEFT JOIN outlet_perks op ON o.id = op.outlet_id
-            LEFT JOIN perks p ON op.perk_id = p.id
-        """
+    def _service_perk_groups(self, entities: Dict) -> List[List[str]]:
+        """Perk codes for each detected service the knowledge base knows about"""
+        return [
+            self.knowledge_base.service_knowledge[service]['perk_codes']
+            for service in entities['services']
+            if service in self.knowledge_base.service_knowledge
+        ]
+    
+    def _filter_outlets(self, snapshot, entities: Dict) -> List[Dict]:
+        """Select snapshot outlets matching the requested services and locations"""
+        matched_ids = self._matching_ids(snapshot, entities)
+        if matched_ids is None:
+            return list(snapshot.outlets)
+        return [snapshot.by_id[outlet_id] for outlet_id in matched_ids.tolist()]
+    
+    @stage("filter_outlets")
+    def _matching_ids(self, snapshot, entities: Dict) -> Optional[np.ndarray]:
+        """Sorted ids of outlets matching the requested services and locations; None when nothing narrows them"""
+        wanted_codes = {code for group in self._service_perk_groups(entities) for code in group}
         
-        conditions = []
-        params = []
-        
-        if entities['services']:  
-            perk_conditions = []
-            for service in entities['services']:
-                if service in self.knowledge_base.service_knowledge:
-                    perk_codes = self.knowledge_base.service_knowledge[service]['perk_codes']
-                    for perk_code in perk_codes:
-                        perk_conditions.append("p.code = %s")
-                        params.append(perk_code)
-            
-            if perk_conditions:
-                conditions.append(f"({' OR '.join(perk_conditions)})")
+        locations = [
+            self.knowledge_base.location_aliases.get(location, location).lower()
+            for location in entities['locations']
+        ]
         
-        if entities['locations']:
-            location_conditions = []
-            for location in entities['locations']:
-                normalized_location = self.knowledge_base.location_aliases.get(location, location)
-                location_conditions.append("o.address LIKE %s")
-                params.append(f"%{normalized_location}%")
-            
-            if location_conditions:
-                conditions.append(f"({' OR '.join(location_conditions)})")
+        matched_ids = None
+        if wanted_codes:
+            perk_index = get_perk_index(snapshot)
+            matched_ids = perk_index.ids[perk_index.any_of(wanted_codes)]
         
-        if conditions:
-            sql = f"{base_query} WHERE {' AND '.join(conditions)} GROUP BY o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude"
-        else:
-            sql = f"{base_query} GROUP BY o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude"
+        if locations:
+            text_index = get_text_index(snapshot, self.text_processor.normalize_text)
+            located = set()
+            for location in locations:
+                located |= text_index.containing('address', location)
+            located = np.fromiter(located, dtype=np.int64, count=len(located))
+            matched_ids = located if matched_ids is None else np.intersect1d(matched_ids, located)
         
-        return sql, tuple(params)
+        return None if matched_ids is None else np.sort(matched_ids)
     
-    def _rank_outlets_by_relevance(self, outlets: List[Dict], query: str, entities: Dict) -> List[Dict]:
-        """Rank outlets by relevance to user query"""
+    def _rank_outlets_by_relevance(self, outlets: List[Dict], query: str, entities: Dict, snapshot=None,
+                                   limit: Optional[int] = None) -> List[Dict]:
+        """Rank outlets by relevance to user query, keeping only the best `limit` when given"""
         if not outlets:
             return outlets
         
-        scored_outlets = []
+        scores = self._score_outlets(outlets, query, entities, snapshot)
+        return [outlets[position] for position in top_k(scores, limit).tolist()]
+    
+    @stage("score_outlets")
+    def _score_outlets(self, outlets: List[Dict], query: str, entities: Dict, snapshot=None) -> np.ndarray:
+        """Relevance score of each outlet, aligned with `outlets`"""
+        if not outlets:
+            return np.zeros(0)
         
-        for outlet in outlets:
-            score = 0.0
-            
-            if entities['locations']:
-                for location in entities['locations']:
-                    if location.lower() in outlet.get('address', '').lower():
-                        score += 0.5
-            
-            if entities['services']:
-                outlet_perks = outlet.get('perk_codes', '') or ''
-                for service in entities['services']:
-                    if service in self.knowledge_base.service_knowledge:
-                        perk_codes = self.knowledge_base.service_knowledge[service]['perk_codes']
-                        for perk_code in perk_codes:
-                            if perk_code in outlet_perks:
-                                score += 0.8
-                                break
-            
-            name_similarity = self.text_processor.calculate_similarity(
-                query, outlet.get('name', '')
-            )
-            score += name_similarity * 0.3
-            
-            scored_outlets.append((outlet, score))
+        snapshot = snapshot or outlet_store.get()
+        ids = np.fromiter((outlet['id'] for outlet in outlets), dtype=np.int64, count=len(outlets))
+        rows = np.fromiter((snapshot.row_of[outlet_id] for outlet_id in ids.tolist()), dtype=np.int64, count=len(ids))
         
-        scored_outlets.sort(key=lambda x: x[1], reverse=True)
-        return [outlet for outlet, score in scored_outlets]
+        scores = np.zeros(len(outlets))
+        groups = self._service_perk_groups(entities)
+        if groups:
+            scores += 0.8 * get_perk_index(snapshot).groups_matched(groups, rows)
+        
+        if entities['locations']:
+            text_index = get_text_index(snapshot, self.text_processor.normalize_text)
+            located = np.zeros(len(outlets), dtype=np.int64)
+            for location in entities['locations']:
+                matched = text_index.containing('address', location)
+                located += np.isin(ids, np.fromiter(matched, dtype=np.int64, count=len(matched)))
+            scores += 0.5 * located
+        
+        name_vectors = get_name_vectors(snapshot, self.text_processor.extract_keywords)
+        scores += name_vectors.jaccard(self.text_processor.extract_keywords(query), rows) * 0.3
+        return scores
     
     def _format_outlet_perks(self, outlet: Dict) -> str:
         """Format outlet perks for display"""
@@ -456,33 +580,31 @@ class AgenticChatbot:
         
         return f" ({', '.join(display_perks)})" if display_perks else ""
     
+    def _format_outlet_entry(self, outlet: Dict) -> str:
+        """One outlet as a bullet of the answer text"""
+        name = outlet.get('name', 'Unknown')
+        address = outlet.get('address', 'Address not available')
+        
+        perks_info = self._format_outlet_perks(outlet)
+        
+        return f"• {name}{perks_info}\n  📍 {address}"
+    
     def _generate_response(self, intent: str, outlets: List[Dict], entities: Dict, query: str) -> Tuple[str, List[str]]:
         """Generate natural language response"""
-        outlet_count = len(outlets) if outlets else 0
+        response, suggested_actions = self._summarize_response(intent, len(outlets) if outlets else 0, entities)
+        if outlets:
+            response += "\n\n" + "\n\n".join(self._format_outlet_entry(outlet) for outlet in outlets)
+        return response, suggested_actions
+    
+    def _summarize_response(self, intent: str, outlet_count: int, entities: Dict) -> Tuple[str, List[str]]:
+        """Answer text without the outlet list, plus suggested actions"""
         suggested_actions = []
         
-        def format_outlet_list(outlets_list):
-            if not outlets_list:
-                return ""
-            
-            formatted_list = []
-            
-            for outlet in outlets_list:
-                name = outlet.get('name', 'Unknown')
-                address = outlet.get('address', 'Address not available')
-                
-                perks_info = self._format_outlet_perks(outlet)
-                
-                formatted_list.append(f"• {name}{perks_info}\n  📍 {address}")
-            
-            return "\n\n" + "\n\n".join(formatted_list)
-        
         if intent == 'service_inquiry':
             if 'birthday_party' in entities['services']:
                 if outlet_count > 0:
                     response = f"🎉 Great news! I found {outlet_count} McDonald's outlet{'s' if outlet_count != 1 else ''} that offer birthday party services."
                     response += " These locations can host your special celebration with party packages, Happy Meals, decorations, and fun activities for kids!"
-                    response += format_outlet_list(outlets)
                     suggested_actions = ["Book a party", "View party packages", "Get contact details", "Get directions"]
                 else:
                     response = "I couldn't find any outlets specifically offering birthday party services in our database. However, many McDonald's outlets can accommodate celebrations - I'd recommend contacting them directly!"
@@ -494,7 +616,6 @@ class AgenticChatbot:
                     if entities['locations']:
                         response += f" These are located around {', '.join(entities['locations'])}."
                     response += " Perfect for those late-night cravings or early morning breakfast!"
-                    response += format_outlet_list(outlets)
                     suggested_actions = ["Get directions", "View menu", "Check other services"]
                 else:
                     response = "I couldn't find any 24-hour McDonald's outlets in the specified area. Would you like me to show you outlets with extended hours instead?"
@@ -504,7 +625,6 @@ class AgenticChatbot:
                 if outlet_count > 0:
                     response = f"Perfect! I found {outlet_count} McDonald's outlet{'s' if outlet_count != 1 else ''} with Drive-Thru service."
                     response += " Great for quick and convenient ordering from your car!"
-                    response += format_outlet_list(outlets)
                     suggested_actions = ["Get directions", "View Drive-Thru menu", "Check operating hours"]
                 else:
                     response = "I couldn't find any Drive-Thru McDonald's outlets in the specified area."
@@ -517,7 +637,6 @@ class AgenticChatbot:
                         service_names.append(self.knowledge_base.service_knowledge[service]['description'])
                 
                 response = f"I found {outlet_count} outlet{'s' if outlet_count != 1 else ''} offering {', '.join(service_names) if service_names else 'the requested services'}."
-                response += format_outlet_list(outlets)
                 suggested_actions = ["Get directions", "View details", "Check other services"]
         
         elif intent == 'location_search':
@@ -526,7 +645,6 @@ class AgenticChatbot:
                 if entities['locations']:
                     response += f" near {', '.join(entities['locations'])}"
                 response += ". Here are your options:"
-                response += format_outlet_list(outlets)
                 suggested_actions = ["Get directions", "View details", "Check services"]
             else:
                 response = "I couldn't find any McDonald's outlets in that specific area. Let me show you the nearest alternatives."
@@ -536,7 +654,6 @@ class AgenticChatbot:
             if outlet_count > 0:
                 response = f"I can help you navigate to {outlet_count} nearby McDonald's outlet{'s' if outlet_count != 1 else ''}. "
                 response += "Each location includes Waze links for easy navigation."
-                response += format_outlet_list(outlets)
                 suggested_actions = ["Open in Waze", "Get walking directions", "View on map"]
             else:
                 response = "I need more location information to provide navigation assistance."
@@ -546,7 +663,6 @@ class AgenticChatbot:
             if outlet_count > 0:
                 response = f"Here's what I found: {outlet_count} McDonald's outlet{'s' if outlet_count != 1 else ''} in our database. "
                 response += "Each location offers various services and amenities."
-                response += format_outlet_list(outlets)
                 suggested_actions = ["View all details", "Filter by services", "Find nearest"]
             else:
                 response = "Welcome to the McDonald's Outlet Finder! I can help you find outlets, check services like 24-hour operation, Drive-Thru, and provide directions."
@@ -554,123 +670,441 @@ class AgenticChatbot:
         
         return response, suggested_actions
     
-    async def process_query(self, query: str, user_location: Optional[str] = None, context: Optional[Dict] = None) -> ChatResponse:
+    def _cache_key(self, intent: str, entities: Dict, snapshot) -> Tuple:
+        """Canonical (intent, services, locations, data version) key, so paraphrases share an entry"""
+        locations = {
+            self.knowledge_base.location_aliases.get(location, location).strip().lower()
+            for location in entities['locations']
+        }
+        return (intent, tuple(sorted(set(entities['services']))), tuple(sorted(locations)), snapshot.version)
+    
+    async def process_query(self, query: str, user_location: Optional[str] = None, context: Optional[Dict] = None,
+                            session_id: Optional[str] = None, cursor: Optional[str] = None,
+                            limit: Optional[int] = None) -> ChatResponse:
         """Main agentic processing pipeline"""
+        if cursor:
+            # Continuations page through results already held by the cursor store; no snapshot is needed.
+            return self.answer_query(query, None, user_location, session_id, cursor=cursor, limit=limit)
         try:
-            self.conversation_memory.append({
-                'query': query,
-                'timestamp': datetime.now(),
-                'user_location': user_location
-            })
-            
-            entities = self._extract_entities(query)
-            if user_location and not entities['locations']:
-                entities['locations'].append(user_location)
-            
-            intent, confidence, reasoning = self._reason_about_intent(query, entities)
-            
-            sql, params = self._generate_sql_query(intent, entities)
-            
-            outlets = query_db(sql, params)
+            with stage("load_snapshot"):
+                snapshot = await outlet_store.get_async()
+        except Exception as e:
+            return self._error_response(query, user_location, session_id, e)
+        return self.answer_query(query, snapshot, user_location, session_id, limit=limit)
+    
+    def answer_query(self, query: str, snapshot, user_location: Optional[str] = None,
+                     session_id: Optional[str] = None, answers: Optional[Dict[Tuple, List[Dict]]] = None,
+                     cursor: Optional[str] = None, limit: Optional[int] = None) -> ChatResponse:
+        """Run the pipeline against one snapshot; `answers` shares filtered results across a batch.
+
+        With a cursor the next page of an earlier answer is returned without re-running extraction or
+        filtering; an unknown cursor, or one past the pages it holds, raises ValueError and an expired one
+        CursorExpired.
+        """
+        turn = {
+            'query': query,
+            'timestamp': datetime.now(),
+            'user_location': user_location
+        }
+        if cursor:
+            token, (intent, confidence, reasoning, entities, ranked, total, default_limit), offset = \
+                self.cursors.resume(cursor)
+            if offset >= len(ranked):
+                raise ValueError("cursor is past the held results")
+            limit = limit or default_limit
+        else:
+            token, offset = None, 0
+            entities = {'locations': [], 'services': []}
+        limit = max(1, min(limit or CHAT_RESULT_LIMIT, CHAT_RESULT_MAX))
+        
+        try:
+            if not cursor:
+                entities, intent, confidence, reasoning = self._analyze(query, user_location, snapshot)
+                outlets, scores = self._ranked_result(query, intent, entities, snapshot, answers)
+                total = len(outlets)
+                # Only what a cursor can reach is ranked: a partial top-k over the first page and the
+                # continuation pages, not a full sort. Those outlets are all a cursor holds.
+                with stage("rank_outlets"):
+                    held = limit * (CHAT_CURSOR_MAX_PAGES + 1)
+                    ranked = [outlets[position] for position in top_k(scores, held).tolist()]
+            page = ranked[offset:offset + limit]
             
-            outlets = self._rank_outlets_by_relevance(outlets, query, entities)
+            with stage("generate_response"):
+                response_text, suggested_actions = self._summarize_response(intent, total, entities)
+                if page:
+                    response_text += "\n\n" + "\n\n".join(self._format_outlet_entry(outlet) for outlet in page)
+                if offset or offset + len(page) < total:
+                    response_text += f"\n\nShowing {offset + 1}-{offset + len(page)} of {total}."
             
-            response_text, suggested_actions = self._generate_response(intent, outlets, entities, query)
+            next_cursor = None
+            if offset + len(page) < len(ranked):
+                if token is None:
+                    token = self.cursors.issue((intent, confidence, reasoning, entities, ranked, total, limit))
+                next_cursor = self.cursors.encode(token, offset + len(page))
             
-            return ChatResponse(
+            response = ChatResponse(
                 answer=response_text,
-                outlets=outlets,
+                outlets=page,
                 intent=intent,
                 confidence=confidence,
                 reasoning=reasoning,
-                suggested_actions=suggested_actions
+                suggested_actions=suggested_actions,
+                total=total,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
-            return ChatResponse(
-                answer="I apologize, but I encountered an issue processing your request. Could you please rephrase your question?",
-                intent="error",
-                confidence=0.0,
-                reasoning=f"Error occurred: {str(e)}"
+            return self._error_response(query, user_location, session_id, e, entities)
+        
+        self.conversation_memory.append(
+            turn, session_id, intent=response.intent,
+            locations=entities['locations'], services=entities['services']
+        )
+        return response
+    
+    def _ranked_result(self, query: str, intent: str, entities: Dict, snapshot,
+                       answers: Optional[Dict[Tuple, List[Dict]]] = None) -> Tuple[List[Dict], np.ndarray]:
+        """Matching outlets through the response cache, and their relevance scores for this query"""
+        cache_key = self._cache_key(intent, entities, snapshot)
+        outlets = answers.get(cache_key) if answers is not None else None
+        if outlets is None:
+            outlets = self.response_cache.get(cache_key)
+        if outlets is None:
+            outlets = self._filter_outlets(snapshot, entities)
+            self.response_cache.put(cache_key, outlets)
+        if answers is not None:
+            answers[cache_key] = outlets
+        # Scores depend on the query's own words and raw locations, so paraphrases sharing a key never share them.
+        return outlets, self._score_outlets(outlets, query, entities, snapshot)
+    
+    def _analyze(self, query: str, user_location: Optional[str], snapshot) -> Tuple[Dict, str, float, str]:
+        """Entities, intent, confidence and reasoning for one question"""
+        with stage("extract_entities"):
+            hits = self._scan_query(query, snapshot)
+            
+            entities = self._extract_entities(query, hits)
+            if user_location and not entities['locations']:
+                entities['locations'].append(user_location)
+        
+        with stage("reason_about_intent"):
+            intent, confidence, reasoning = self._reason_about_intent(query, entities, hits)
+        return entities, intent, confidence, reasoning
+    
+    def stream_query(self, query: str, snapshot, user_location: Optional[str] = None,
+                     session_id: Optional[str] = None, chunk_size: int = CHAT_STREAM_CHUNK) -> Iterator[Tuple[str, Dict]]:
+        """Yield (event, payload) pairs: the summary first, then ranked outlets chunk by chunk"""
+        turn = {
+            'query': query,
+            'timestamp': datetime.now(),
+            'user_location': user_location
+        }
+        entities = {'locations': [], 'services': []}
+        intent = "error"
+        try:
+            entities, intent, confidence, reasoning = self._analyze(query, user_location, snapshot)
+            
+            # The summary only needs the match count, so it goes out before outlets are materialized and ranked.
+            cache_key = self._cache_key(intent, entities, snapshot)
+            outlets = self.response_cache.get(cache_key)
+            if outlets is not None:
+                total = len(outlets)
+            else:
+                matched_ids = self._matching_ids(snapshot, entities)
+                total = len(snapshot.outlets) if matched_ids is None else len(matched_ids)
+            summary, suggested_actions = self._summarize_response(intent, total, entities)
+            yield "meta", {
+                'answer': summary,
+                'intent': intent,
+                'confidence': confidence,
+                'reasoning': reasoning,
+                'suggested_actions': suggested_actions,
+                'total': total,
+                'version': snapshot.version,
+            }
+            
+            if outlets is None:
+                outlets = list(snapshot.outlets) if matched_ids is None \
+                    else [snapshot.by_id[outlet_id] for outlet_id in matched_ids.tolist()]
+                self.response_cache.put(cache_key, outlets)
+            scores = self._score_outlets(outlets, query, entities, snapshot)
+            outlets = [outlets[position] for position in top_k(scores).tolist()]
+            for start in range(0, len(outlets), chunk_size):
+                chunk = outlets[start:start + chunk_size]
+                yield "outlets", {
+                    'entries': [self._format_outlet_entry(outlet) for outlet in chunk],
+                    'outlets': chunk,
+                }
+            yield "done", {'total': len(outlets)}
+        except Exception as e:
+            intent = "error"
+            yield "error", {'detail': f"Error occurred: {str(e)}"}
+        finally:
+            self.conversation_memory.append(
+                turn, session_id, intent=intent,
+                locations=entities['locations'], services=entities['services']
             )
+    
+    def answer_batch(self, requests: List[ChatRequest], snapshot) -> Iterator[ChatResponse]:
+        """Answer requests in order against one snapshot, filtering each distinct entity set once"""
+        answers: Dict[Tuple, List[Dict]] = {}
+        for request in requests:
+            try:
+                yield self.answer_query(request.question, snapshot, request.user_location, request.session_id,
+                                        answers, request.cursor, request.limit)
+            except (CursorExpired, ValueError) as e:
+                yield self._error_response(request.question, request.user_location, request.session_id, e)
+    
+    def _error_response(self, query: str, user_location: Optional[str], session_id: Optional[str],
+                        error: Exception, entities: Optional[Dict] = None) -> ChatResponse:
+        entities = entities or {'locations': [], 'services': []}
+        self.conversation_memory.append(
+            {'query': query, 'timestamp': datetime.now(), 'user_location': user_location}, session_id,
+            intent="error", locations=entities['locations'], services=entities['services']
+        )
+        return ChatResponse(
+            answer="I apologize, but I encountered an issue processing your request. Could you please rephrase your question?",
+            intent="error",
+            confidence=0.0,
+            reasoning=f"Error occurred: {str(error)}"
+        )
 
 chatbot = AgenticChatbot()
+outlet_store.add_listener(chatbot.knowledge_base.load_perks)
+outlet_store.add_listener(chatbot.knowledge_base.sync_retriever)
+outlet_store.add_listener(chatbot.response_cache.clear)
 
 # -----------------------------
 # ROUTES
 # -----------------------------
 
+STARTED_AT = datetime.now()
+
+@app.on_event("startup")
+def load_outlet_snapshot():
+    # Never wait for MySQL here: serve the last saved snapshot at once and sync in the background.
+    chatbot.knowledge_base.retriever.load()
+    outlet_store.load_file()
+    outlet_store.start()
+
+@app.on_event("shutdown")
+def close_db_pools():
+    outlet_store.stop()
+    close_pools()
+
+
+INDEX_PATH = 'index.html'
+
+def _json_bytes(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 # Serve index.html at root path
 @app.get("/")
-async def read_index():
-    return FileResponse('index.html')
+async def read_index(request: Request):
+    stat = os.stat(INDEX_PATH)
+    etag = make_etag("index", stat.st_mtime_ns, stat.st_size)
+
+    def render() -> bytes:
+        with open(INDEX_PATH, 'rb') as f:
+            return f.read()
+
+    return cached_response(request, etag, stat.st_mtime, render, media_type="text/html")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_ROWS = 500
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated `fields=` projection against the Outlet schema"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in Outlet.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(Outlet.model_fields)}"
+        )
+    return requested
+
+def _project(outlet: Dict, fields: Optional[List[str]]) -> Dict:
+    if fields is None:
+        return {field: outlet[field] for field in Outlet.model_fields}
+    return {field: outlet[field] for field in fields}
+
+def _iter_ndjson(rows: List[Dict], fields: Optional[List[str]]):
+    """Serialize rows lazily, a batch at a time, as newline-delimited JSON"""
+    for start in range(0, len(rows), NDJSON_BATCH_ROWS):
+        batch = rows[start:start + NDJSON_BATCH_ROWS]
+        yield "".join(json.dumps(_project(outlet, fields), ensure_ascii=False) + "\n" for outlet in batch)
 
 @app.get("/outlets", response_model=List[Outlet])
-def list_outlets():
-    """Get all outlets from DB with their perks"""
-    sql = """
-        SELECT DISTINCT 
-            o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude,
-            GROUP_CONCAT(p.name) as perks
-        FROM outlets o
-        LEFT JOIN outlet_perks op ON o.id = op.outlet_id
-        LEFT JOIN perks p ON op.perk_id = p.id
-        GROUP BY o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude
-    """
-    outlets = query_db(sql)
-    
-    for outlet in outlets:
-        if outlet.get('perks'):
-            outlet['perks'] = outlet['perks'].split(',')
-        else:
-            outlet['perks'] = []
-    
-    return outlets
+def list_outlets(
+    request: Request,
+    after_id: Optional[int] = Query(None, ge=0, description="Return outlets with id greater than this cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Maximum outlets per page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,latitude,longitude"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="Force json or ndjson output"),
+):
+    """Get outlets with their perks from the in-memory snapshot, optionally paged, projected or streamed"""
+    snapshot = outlet_store.get()
+    projection = _parse_fields(fields)
+    wants_ndjson = format == "ndjson" or (
+        format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+    etag = make_etag("outlets", snapshot.version, after_id, limit, projection, wants_ndjson)
+    if is_not_modified(request, etag, snapshot.loaded_at):
+        return not_modified_response(etag, snapshot.loaded_at)
+
+    rows = snapshot.page(after_id, limit)
+    headers = {}
+    if limit is not None and len(rows) == limit and rows[-1]["id"] != snapshot.ids[-1]:
+        next_after_id = rows[-1]["id"]
+        next_url = request.url.include_query_params(after_id=next_after_id)
+        headers["X-Next-After-Id"] = str(next_after_id)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if wants_ndjson:
+        headers.update(validator_headers(etag, snapshot.loaded_at))
+        return StreamingResponse(_iter_ndjson(rows, projection), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return cached_response(
+        request, etag, snapshot.loaded_at,
+        lambda: _json_bytes([_project(outlet, projection) for outlet in rows]),
+        headers=headers
+    )
+
+@app.get("/outlets/nearest", response_model=List[NearbyOutlet])
+def nearest_outlets(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    radius_km: Optional[float] = Query(None, gt=0),
+):
+    """Get the k outlets closest to a point, optionally within a radius"""
+    snapshot = outlet_store.get()
+    hits = get_spatial_index(snapshot).nearest(lat, lon, k=k, radius_km=radius_km)
+    return [
+        {**snapshot.by_id[outlet_id], "distance_km": round(distance, 3)}
+        for outlet_id, distance in hits
+    ]
 
 @app.get("/outlets/{outlet_id}", response_model=Outlet)
-def get_outlet(outlet_id: int):
+def get_outlet(outlet_id: int, request: Request):
     """Get single outlet by ID with perks"""
-    sql = """
-        SELECT DISTINCT 
-            o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude,
-            GROUP_CONCAT(p.name) as perks
-        FROM outlets o
-        LEFT JOIN outlet_perks op ON o.id = op.outlet_id
-        LEFT JOIN perks p ON op.perk_id = p.id
-        WHERE o.id = %s
-        GROUP BY o.id, o.name, o.address, o.waze_link, o.latitude, o.longitude
-    """
-    
-    result = query_db(sql, (outlet_id,))
-    
-    if result:
-        outlet = result[0]
-        if outlet.get('perks'):
-            outlet['perks'] = outlet['perks'].split(',')
-        else:
-            outlet['perks'] = []
-        return outlet
-    else:
+    snapshot = outlet_store.get()
+    outlet = snapshot.by_id.get(outlet_id)
+    if outlet is None:
         raise HTTPException(status_code=404, detail="Outlet not found.")
+    # Single-outlet bodies are tiny, so only validate them instead of caching encodings.
+    etag = make_etag("outlet", snapshot.version, outlet_id)
+    if is_not_modified(request, etag, snapshot.loaded_at):
+        return not_modified_response(etag, snapshot.loaded_at)
+    return JSONResponse(content=_project(outlet, None), headers=validator_headers(etag, snapshot.loaded_at))
 
 @app.get("/perks")
-def list_perks():
+def list_perks(request: Request):
     """Get all available perks"""
-    return query_db("SELECT id, code, name FROM perks ORDER BY name")
+    snapshot = outlet_store.get()
+    etag = make_etag("perks", snapshot.version)
+    return cached_response(request, etag, snapshot.loaded_at, lambda: _json_bytes(snapshot.perks))
+
+@app.get("/analytics/overlaps")
+def overlap_analysis(radius_km: float = Query(5.0, gt=0, le=50)):
+    """Find outlets whose catchment circles overlap, cached per radius and data version"""
+    snapshot = outlet_store.get()
+    report = get_overlaps(snapshot, round(radius_km, 2))
+    return {**report, "version": snapshot.version}
+
+@app.get("/search")
+def search_documents(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    kind: Optional[str] = Query(None, pattern="^(service|perk|outlet)$"),
+):
+    """BM25 search over service descriptions, perk names and outlet names/addresses"""
+    snapshot = outlet_store.get()
+    results = []
+    for doc_id, score in chatbot.knowledge_base.retriever.search(q, k, kind):
+        doc_kind, key = doc_id.split(':', 1)
+        result = {"id": doc_id, "kind": doc_kind, "score": round(score, 4)}
+        if doc_kind == 'outlet':
+            result["outlet"] = snapshot.by_id.get(int(key))
+        elif doc_kind == 'service':
+            result["description"] = chatbot.knowledge_base.service_knowledge.get(key, {}).get('description')
+        else:
+            result["code"] = key
+        results.append(result)
+    return {"query": q, "results": results, "version": snapshot.version}
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     Agentic AI chatbot with advanced NLP and reasoning capabilities
     """
-    response = await chatbot.process_query(
-        query=request.question,
-        user_location=request.user_location,
-        context=request.context
-    )
+    try:
+        response = await chatbot.process_query(
+            query=request.question,
+            user_location=request.user_location,
+            context=request.context,
+            session_id=request.session_id,
+            cursor=request.cursor,
+            limit=request.limit
+        )
+    except CursorExpired:
+        raise HTTPException(status_code=410, detail="Cursor expired; ask the question again")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return response
 
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "5000"))
+
+def _iter_json_array(responses: Iterator[ChatResponse]):
+    """Stream responses as one JSON array, element by element"""
+    yield "["
+    for position, response in enumerate(responses):
+        yield ("," if position else "") + response.model_dump_json()
+    yield "]"
+
+@app.post("/chat/batch", response_model=List[ChatResponse])
+async def chat_batch(requests: List[ChatRequest]):
+    """
+    Answer many questions against one outlet snapshot, streamed back as a JSON array in request order
+    """
+    if len(requests) > CHAT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {CHAT_BATCH_MAX} questions per batch")
+    try:
+        snapshot = await outlet_store.get_async()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Outlet data unavailable: {e}")
+    # The generator is synchronous, so Starlette drives it from its threadpool off the event loop.
+    return StreamingResponse(
+        _iter_json_array(chatbot.answer_batch(requests, snapshot)),
+        media_type="application/json",
+        headers={"X-Data-Version": snapshot.version},
+    )
+
+def _iter_sse(events: Iterator[Tuple[str, Dict]]):
+    """Encode (event, payload) pairs as server-sent events"""
+    for event, payload in events:
+        yield f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'), default=str)}\n\n"
+
+@app.get("/chat/stream")
+async def chat_stream(
+    question: str = Query(..., min_length=1),
+    user_location: Optional[str] = None,
+    session_id: Optional[str] = None,
+):
+    """
+    Server-sent events version of /chat: a `meta` event with intent and summary, then ranked `outlets` chunks, then `done`
+    """
+    try:
+        snapshot = await outlet_store.get_async()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Outlet data unavailable: {e}")
+    return StreamingResponse(
+        _iter_sse(chatbot.stream_query(question, snapshot, user_location, session_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Data-Version": snapshot.version},
+    )
+
 @app.get("/chat/capabilities")
 def get_chatbot_capabilities():
     """Get chatbot capabilities and knowledge base info"""
@@ -701,45 +1135,66 @@ def get_chatbot_capabilities():
     }
 
 @app.get("/chat/memory")
-def get_chat_memory():
+def get_chat_memory(session_id: Optional[str] = None):
     """Get chatbot conversation memory and statistics"""
     memory = chatbot.conversation_memory
+    stats = memory.stats()
     
-    total_conversations = len(memory)
-    recent_conversations = [
-        conv for conv in memory[-10:]  
-        if conv.get('timestamp')
-    ]
-    
-    intent_stats = {}
-    location_stats = {}
-    
-    for conv in memory:
-
-        pass
+    def describe(conv):
+        return {
+            "query": conv.get("query", ""),
+            "timestamp": conv.get("timestamp").isoformat() if conv.get("timestamp") else None,
+            "user_location": conv.get("user_location"),
+            "intent": conv.get("intent"),
+            "session_id": conv.get("session_id")
+        }
     
-    return {
-        "total_conversations": total_conversations,
-        "recent_conversations": [
-            {
-                "query": conv.get("query", ""),
-                "timestamp": conv.get("timestamp").isoformat() if conv.get("timestamp") else None,
-                "user_location": conv.get("user_location")
-            }
-            for conv in recent_conversations
-        ],
-        "memory_size": len(chatbot.conversation_memory),
+    result = {
+        "total_conversations": stats["total_conversations"],
+        "recent_conversations": [describe(conv) for conv in memory.recent()],
+        "memory_size": stats["memory_size"],
+        "sessions": stats["sessions"],
+        "evicted_sessions": stats["evicted_sessions"],
+        "limits": stats["limits"],
+        "intent_stats": stats["intent_stats"],
+        "location_stats": stats["location_stats"],
+        "service_stats": stats["service_stats"],
+        "response_cache": chatbot.response_cache.stats(),
+        "cursors": chatbot.cursors.stats(),
         "knowledge_base_info": {
             "services_count": len(chatbot.knowledge_base.service_knowledge),
             "location_aliases_count": len(chatbot.knowledge_base.location_aliases)
         }
     }
+    if session_id is not None:
+        result["session"] = [describe(conv) for conv in memory.session(session_id)]
+    return result
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Route, chat stage and DB query latency histograms in Prometheus text format
+    """
+    return PlainTextResponse(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/health/live")
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive", "started_at": STARTED_AT.isoformat()}
+
+@app.get("/health/ready")
+def readiness():
+    """Readiness probe: an outlet snapshot is loaded, from the snapshot file or the database"""
+    status = outlet_store.status()
+    ready = status["loaded"]
+    body = {"status": "ready" if ready else "not_ready", "snapshot": status}
+    return JSONResponse(content=body, status_code=200 if ready else 503)
 
 @app.get("/health")
 def health_check():
     """Health check endpoint for monitoring service status"""
     try:
-        test_query = "SELECT COUNT(*) as count FROM outlets LIMIT 1"
+        test_query = "SELECT COUNT(*) as count FROM outlets WHERE closed_at IS NULL"
         db_result = query_db(test_query)
         db_status = "healthy" if db_result else "unhealthy"
         outlet_count = db_result[0]["count"] if db_result else 0
@@ -753,11 +1208,15 @@ def health_check():
             "services": {
                 "database": {
                     "status": db_status,
-                    "outlet_count": outlet_count
+                    "outlet_count": outlet_count,
+                    "pool": db_pool.stats(),
+                    "snapshot": outlet_store.status()
                 },
                 "chatbot": {
                     "status": chatbot_status,
                     "memory_size": len(chatbot.conversation_memory) if chatbot else 0,
+                    "response_cache": chatbot.response_cache.stats() if chatbot else {},
+                    "cursors": chatbot.cursors.stats() if chatbot else {},
                     "knowledge_services": len(chatbot.knowledge_base.service_knowledge) if chatbot and hasattr(chatbot, 'knowledge_base') else 0
                 }
             },
@@ -774,7 +1233,7 @@ def health_check():
             "version": "3.0.0",
             "error": str(e),
             "services": {
-                "database": {"status": "error"},
+                "database": {"status": "error", "pool": db_pool.stats()},
                 "chatbot": {"status": "error"}
             }
         }
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
-import re
-import time
-import json
-import mysql.connector
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from bs4 import BeautifulSoup
+
+from card_parser import parse_cards, parser_name
+from db import get_pool
+from outlet_keys import scrape_keys
+from outlet_writer import OutletWriter
+from scrape_waits import AdaptiveWait, any_of, count_at_least, count_grows, is_stale, new_window, url_loaded
+from waze_links import WazeResolver
 
 # ----------------------------
 # DB CONFIG
@@ -20,11 +24,18 @@ db_config = {
 }
 
 def get_db_connection():
-    return mysql.connector.connect(**db_config)
+    """Check a connection out of the shared pool (use as a context manager)"""
+    return get_pool(db_config).connection()
 
 # ----------------------------
 # SCRAPER SETUP
 # ----------------------------
+LOCATE_URL = 'https://www.mcdonalds.com.my/locate-us'
+CARD_LOCATOR = (By.CSS_SELECTOR, 'div.columns.large-3.medium-4.small-12')
+LOAD_MORE_SELECTOR = '.btnLoadMore'
+# Optional path to keep the loaded results page, e.g. as a fixture for benchmarks.bench_card_parse
+SAVE_PAGE_PATH = os.getenv('SCRAPE_SAVE_PAGE')
+
 def init_driver():
     opts = Options()
     opts.add_argument('--headless')
@@ -35,128 +46,137 @@ def init_driver():
     print("[INFO] Driver initialized.")
     return driver
 
-def perform_search(driver):
-    driver.get('https://www.mcdonalds.com.my/locate-us')
-    time.sleep(2)
-    box = driver.find_element(By.ID, 'address')
+def perform_search(driver, waiter: AdaptiveWait):
+    driver.get(LOCATE_URL)
+    box = waiter.until('search_page', EC.element_to_be_clickable((By.ID, 'address')))
     box.clear()
     box.send_keys('kuala lumpur')
+    # Cards shown before the search are replaced by the results, so wait for them to go stale.
+    previous = driver.find_elements(*CARD_LOCATOR)
     driver.find_element(By.CSS_SELECTOR, 'div.btnSearchNow').click()
-    time.sleep(3)
-
-def load_all_results(driver):
+    if previous:
+        waiter.until('search_results', is_stale(previous[0]))
+    return waiter.until('search_results', count_at_least(CARD_LOCATOR, 1))
+
+def _visible_load_more(driver):
+    for btn in driver.find_elements(By.CSS_SELECTOR, LOAD_MORE_SELECTOR):
+        if btn.is_displayed():
+            return btn
+    return None
+
+def load_all_results(driver, waiter: AdaptiveWait) -> bool:
+    """Click Load More until it disappears, waiting for each page of cards to render; False if paging stalled"""
+    count = len(driver.find_elements(*CARD_LOCATOR))
     page = 1
+    complete = True
     while True:
+        btn = _visible_load_more(driver)
+        if btn is None:
+            break
+        driver.execute_script("arguments[0].scrollIntoView();", btn)
+        btn.click()
         try:
-            btn = driver.find_element(By.CSS_SELECTOR, '.btnLoadMore')
-            driver.execute_script("arguments[0].scrollIntoView();", btn)
-            btn.click()
-            time.sleep(2)
-            page += 1
-        except Exception:
+            waiter.until('load_more', any_of(count_grows(CARD_LOCATOR, count), is_stale(btn)))
+            if len(driver.find_elements(*CARD_LOCATOR)) == count and _visible_load_more(driver) is not None:
+                # The button was re-rendered ahead of the new cards.
+                waiter.until('load_more', count_grows(CARD_LOCATOR, count))
+        except TimeoutException:
+            print(f"[WARN] No new results after page {page}; stopping.")
+            complete = False
             break
-
-# ----------------------------
-# PERKS HELPERS
-# ----------------------------
-def get_or_create_perk(conn, name: str):
-    code = re.sub(r'[^A-Za-z0-9]+', '_', name.strip()).upper()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM perks WHERE code=%s", (code,))
-    row = cur.fetchone()
-    if row:
-        pid = row[0]
-    else:
-        cur.execute("INSERT INTO perks (code, name) VALUES (%s, %s)", (code, name.strip()))
-        conn.commit()
-        pid = cur.lastrowid
-    cur.close()
-    return pid
-
-def link_outlet_perks(conn, outlet_id: int, perk_ids: list):
-    cur = conn.cursor()
-    for pid in perk_ids:
-        cur.execute("""
-            INSERT IGNORE INTO outlet_perks (outlet_id, perk_id)
-            VALUES (%s, %s)
-        """, (outlet_id, pid))
-    conn.commit()
-    cur.close()
+        count = len(driver.find_elements(*CARD_LOCATOR))
+        page += 1
+    print(f"[INFO] Loaded {count} results over {page} page(s).")
+    return complete
 
 # ----------------------------
 # SCRAPE & STORE
 # ----------------------------
-def save_outlet_and_perks(entry: dict):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO outlets
-          (name, address, waze_link)
-        VALUES (%s, %s, %s)
-    """, (entry['name'], entry['address'], entry['waze_link']))
-    conn.commit()
-    outlet_id = cur.lastrowid
-    cur.close()
-
-    perk_ids = []
-    for perk_name in entry['perks']:
-        pid = get_or_create_perk(conn, perk_name)
-        perk_ids.append(pid)
-
-    link_outlet_perks(conn, outlet_id, perk_ids)
-    conn.close()
-
-    print(f"[INFO] Saved '{entry['name']}' with perks: {entry['perks']}")
-
-def scrape_and_store(driver):
-    cards = driver.find_elements(By.CSS_SELECTOR, 'div.columns.large-3.medium-4.small-12')
+def click_waze_link(driver, waiter: AdaptiveWait, card):
+    """Fallback for anchors without an href: open the link in a window and read where it lands"""
     original = driver.current_window_handle
-
-    for idx, card in enumerate(cards, start=1):
-        print(f"[INFO] Processing outlet {idx}/{len(cards)}...")
-        html = card.get_attribute('innerHTML')
-        soup = BeautifulSoup(html, 'html.parser')
-
+    try:
+        waze = card.find_element(By.XPATH, ".//a[contains(text(),'Waze')]")
+        handles = driver.window_handles
+        driver.execute_script("arguments[0].click();", waze)
+        handle = waiter.until('waze_window', new_window(handles))
+        driver.switch_to.window(handle)
+        try:
+            return waiter.until('waze_redirect', url_loaded)
+        finally:
+            driver.close()
+            driver.switch_to.window(original)
+    except (NoSuchElementException, TimeoutException):
+        return None
+
+def scrape_and_store(driver, waiter: AdaptiveWait, resolver: WazeResolver, complete: bool = True):
+    # One page_source round-trip and one parse for every card, instead of an RPC and a parser per card.
+    with waiter.timer.phase('parse'):
+        page = driver.page_source
+        records = parse_cards(page)
+    print(f"[INFO] Parsed {len(records)} outlets with {parser_name()}.")
+    if SAVE_PAGE_PATH:
+        with open(SAVE_PAGE_PATH, 'w', encoding='utf-8') as f:
+            f.write(page)
+
+    # Waze links come from the anchors' href; redirects are followed concurrently, cached per outlet.
+    # Keys are the writer's, so outlets sharing a name keep separate links and cache entries.
+    keys = scrape_keys((record.name, record.address) for record in records)
+    with waiter.timer.phase('waze_resolve'):
+        links = resolver.resolve_all((key, record.waze_href) for key, record in zip(keys, records) if record.waze_href)
+    print(f"[INFO] Waze links: {resolver.stats}")
+
+    # Only anchors without a usable href still need a browser click.
+    cards = [None] * len(records)
+    if any(record.waze_href is None for record in records):
+        elements = driver.find_elements(*CARD_LOCATOR)
+        if len(elements) == len(records):
+            cards = elements
+        else:
+            print(f"[WARN] {len(elements)} card elements but {len(records)} parsed cards; skipping Waze clicks.")
+
+    entries = []
+    for idx, (key, record, card) in enumerate(zip(keys, records, cards), start=1):
         entry = {
-            'name': None,
-            'address': None,
-            'waze_link': None,
-            'perks': []
+            'name': record.name,
+            'address': record.address,
+            'perks': list(record.perks)
         }
 
-        script = soup.find('script', type='application/ld+json')
-        if script and script.string:
-            data = json.loads(script.string)
-            entry['name']    = data.get('name')
-            entry['address'] = data.get('address')
-
-        for span in soup.select('.addressTop .ed-tooltiptext'):
-            text = span.get_text(strip=True)
-            if text and 'caret' not in text.lower():
-                entry['perks'].append(text)
-
-        try:
-            waze = card.find_element(By.XPATH, ".//a[contains(text(),'Waze')]")
-            driver.execute_script("arguments[0].click();", waze)
-            time.sleep(2)
-            for h in driver.window_handles:
-                if h != original:
-                    driver.switch_to.window(h)
-                    entry['waze_link'] = driver.current_url
-                    driver.close()
-                    driver.switch_to.window(original)
-                    break
-        except (NoSuchElementException, TimeoutException):
-            pass
-
-        save_outlet_and_perks(entry)
+        # Links that could not be resolved are left out, so the writer keeps the stored one.
+        if record.waze_href is not None:
+            if key in links:
+                entry['waze_link'] = links[key]
+        elif card is not None:
+            print(f"[INFO] Opening Waze link of outlet {idx}/{len(records)} in the browser...")
+            entry['waze_link'] = click_waze_link(driver, waiter, card)
+
+        entries.append(entry)
+
+    # One connection for the whole write; changed outlets go in chunks, one transaction each.
+    with waiter.timer.phase('save'), get_db_connection() as conn, OutletWriter(conn) as writer:
+        writer.write(entries)
+        if complete:
+            writer.finish()
+        else:
+            print("[WARN] Results may be incomplete; outlets missing from this scrape are left open.")
+    print(f"[INFO] Saved {writer.report()}.")
+    print("[INFO] Changes:")
+    for line in writer.summary():
+        print(f"  {line}")
 
 if __name__ == '__main__':
     driver = init_driver()
+    waiter = AdaptiveWait(driver)
+    resolver = WazeResolver()
     try:
-        perform_search(driver)
-        load_all_results(driver)
-        scrape_and_store(driver)
+        perform_search(driver, waiter)
+        complete = load_all_results(driver, waiter)
+        scrape_and_store(driver, waiter, resolver, complete)
         print("[INFO] All done.")
     finally:
         driver.quit()
+        resolver.close()
+        print("[INFO] Phase timings:")
+        for line in waiter.timer.report():
+            print(f"  {line}")
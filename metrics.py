@@ -0,0 +1,259 @@
+import functools
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# -----------------------------
+# METRICS CONFIG
+# -----------------------------
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"  # Starlette appends the charset
+SQL_SHAPE_MAX = 200
+
+
+class _Metric:
+    """Base for metrics whose series live in per-thread shards, so recording never takes a lock"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        self._shards_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Once per thread: each shard is written only by its owner and read by the exporter.
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple[str, ...], list] = {}
+        for shard in shards:
+            for labels, values in list(shard.items()):
+                values = list(values)
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = values
+                else:
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return merged
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, values in sorted(self._merged().items()):
+            lines.extend(self._samples(labels, values))
+        return lines
+
+    def _samples(self, labels: Tuple[str, ...], values: list) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0.0]
+        series[0] += amount
+
+    def _samples(self, labels, values):
+        return [f"{self.name}_total{self._labels(labels)} {_number(values[0])}"]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # One slot per bucket, one for +Inf, then the running sum.
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels: str) -> "Span":
+        return Span(self, labels)
+
+    def _samples(self, labels, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, values):
+            cumulative += count
+            le = 'le="%s"' % _number(bound)
+            lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+        cumulative += values[len(self.buckets)]
+        lines.append(f"{self.name}_bucket{self._labels(labels, _INF_LABEL)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(labels)} {_number(values[-1])}")
+        lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+class Span:
+    """Times a block (`with`) or every call of a function (decorator) into a histogram"""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        histogram, labels = self.histogram, self.labels
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+        return wrapper
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_INF_LABEL = 'le="+Inf"'
+REGISTRY: List[_Metric] = []
+
+
+def render_latest() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in list(REGISTRY):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# SQL SHAPES
+# -----------------------------
+_SQL_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_SQL_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|\?")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=512)
+def sql_shape(sql: str) -> str:
+    """SQL with literals and placeholders folded to ?, so similar statements share a label"""
+    shape = _SQL_STRING.sub("?", sql)
+    shape = _SQL_NUMBER.sub("?", shape)
+    shape = _SQL_PLACEHOLDER.sub("?", shape)
+    shape = _SQL_IN_LIST.sub("(?)", shape)
+    shape = _SQL_SPACE.sub(" ", shape).strip()
+    return shape if len(shape) <= SQL_SHAPE_MAX else shape[:SQL_SHAPE_MAX - 3] + "..."
+
+
+# -----------------------------
+# APPLICATION METRICS
+# -----------------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte",
+    ("method", "route", "status"),
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes", "Response body size", ("route",), SIZE_BUCKETS,
+)
+CHAT_STAGE_SECONDS = Histogram(
+    "chat_stage_duration_seconds", "Time spent in each chat pipeline stage", ("stage",),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Execute plus fetch time by SQL shape", ("shape",),
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows", "Rows fetched by SQL shape", ("shape",), ROW_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors", "Statements that raised, by SQL shape", ("shape",),
+)
+
+
+def stage(name: str) -> Span:
+    """Span over one chat pipeline stage"""
+    return CHAT_STAGE_SECONDS.time(name)
+
+
+def observe_query(sql: str, seconds: float, rows: int):
+    shape = sql_shape(sql)
+    DB_QUERY_SECONDS.observe(seconds, shape)
+    DB_QUERY_ROWS.observe(rows, shape)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and response size per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = [500, 0]  # status, body bytes
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                state[1] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched route in the shared scope; unmatched paths share one label.
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], template, str(state[0]))
+            HTTP_RESPONSE_BYTES.observe(state[1], template)
@@ -3,11 +3,12 @@ import re
 import time
 import sys
 import requests
-import mysql.connector
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from urllib.parse import quote_plus
 
+from db import get_pool
+
 # ----------------------------
 # CONFIGURATION
 # ----------------------------
@@ -28,7 +29,8 @@ BAR_LEN            = 40
 # HELPERS
 # ----------------------------
 def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    """Check a connection out of the shared pool (use as a context manager)"""
+    return get_pool(DB_CONFIG).connection()
 
 def clean_address(name: str, raw: str) -> str:
     """
@@ -112,14 +114,16 @@ def main():
     chrome_opts.add_argument('--disable-gpu')
     driver = webdriver.Chrome(options=chrome_opts)
 
-    conn = get_db_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("""
-        SELECT id, name, address
-          FROM outlets
-         WHERE latitude IS NULL OR longitude IS NULL
-    """)
-    rows = cur.fetchall()
+    with get_db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("""
+            SELECT id, name, address
+              FROM outlets
+             WHERE (latitude IS NULL OR longitude IS NULL)
+               AND closed_at IS NULL
+        """)
+        rows = cur.fetchall()
+        cur.close()
     total = len(rows)
     updated = 0
 
@@ -148,17 +152,20 @@ def main():
             lat, lon = geocode_with_selenium(address, driver)
             source = 'GMap'
 
+        # Geocoding takes seconds per row, so only hold a pooled
+        # connection for the duration of the UPDATE itself.
         if lat is not None and lon is not None:
-            cur.execute(UPDATE_SQL, (lat, lon, oid))
-            conn.commit()
+            with get_db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(UPDATE_SQL, (lat, lon, oid))
+                conn.commit()
+                cur.close()
             updated += 1
 
         print_progress(idx, total, name, source if lat else 'MISS', updated)
 
     print("\n[INFO] Geocoding complete.")
     driver.quit()
-    cur.close()
-    conn.close()
 
 if __name__ == "__main__":
     main()
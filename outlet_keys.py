@@ -0,0 +1,23 @@
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+
+def perk_code(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', name.strip()).upper()
+
+
+def outlet_key(name: Optional[str], address: Optional[str] = None) -> str:
+    """Natural key of an outlet: its normalized name, plus its address when the name alone is ambiguous"""
+    key = ' '.join((name or '').split()).lower()
+    if address is not None:
+        key = f"{key} | {' '.join(address.split()).lower()}"
+    return key
+
+
+def scrape_keys(outlets: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[str]:
+    """Key of each (name, address) of one scrape: the name, qualified by address when the scrape has it more than once"""
+    outlets = list(outlets)
+    counts = Counter(outlet_key(name) for name, _ in outlets)
+    return [outlet_key(name, address or '') if counts[outlet_key(name)] > 1 else outlet_key(name)
+            for name, address in outlets]
@@ -0,0 +1,325 @@
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from db import fetch_all
+
+# -----------------------------
+# SNAPSHOT CONFIG
+# -----------------------------
+VERSION_POLL_SECONDS = float(os.getenv("OUTLET_VERSION_POLL_SECONDS", "30"))
+SNAPSHOT_PATH = os.getenv("OUTLET_SNAPSHOT_PATH", os.path.join(os.path.dirname(__file__), "data", "outlet_snapshot.json.gz"))
+SNAPSHOT_FORMAT = 1
+RETRY_INITIAL_SECONDS = float(os.getenv("OUTLET_RETRY_INITIAL_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("OUTLET_RETRY_MAX_SECONDS", "60"))
+
+# Cheap fingerprint of all three tables. Any scraper insert, geocoder update or
+# perk change alters at least one of these aggregates.
+VERSION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM outlets) AS outlet_count,
+        (SELECT COALESCE(MAX(id), 0) FROM outlets) AS max_outlet_id,
+        (SELECT COALESCE(SUM(CRC32(CONCAT_WS('|', id, name, address, waze_link, latitude, longitude, closed_at))), 0)
+           FROM outlets) AS outlet_checksum,
+        (SELECT COUNT(*) FROM perks) AS perk_count,
+        (SELECT COALESCE(SUM(CRC32(CONCAT_WS('|', id, code, name))), 0) FROM perks) AS perk_checksum,
+        (SELECT COUNT(*) FROM outlet_perks) AS link_count,
+        (SELECT COALESCE(SUM(CRC32(CONCAT_WS('|', outlet_id, perk_id))), 0) FROM outlet_perks) AS link_checksum
+"""
+OUTLETS_SQL = "SELECT id, name, address, waze_link, latitude, longitude FROM outlets WHERE closed_at IS NULL ORDER BY id"
+PERKS_SQL = "SELECT id, code, name FROM perks ORDER BY name"
+OUTLET_PERKS_SQL = "SELECT outlet_id, perk_id FROM outlet_perks ORDER BY outlet_id, perk_id"
+
+
+def _as_float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class OutletSnapshot:
+    """Immutable in-memory view of outlets and perks at one data version"""
+
+    def __init__(self, version: str, outlets: List[Dict], perks: List[Dict],
+                 perk_codes: Dict[int, FrozenSet[str]], source: str = "database"):
+        self.version = version
+        self.source = source
+        self.outlets = outlets
+        self.ids = [outlet["id"] for outlet in outlets]
+        self.by_id = {outlet["id"]: outlet for outlet in outlets}
+        self.row_of = {outlet["id"]: row for row, outlet in enumerate(outlets)}
+        self.perks = perks
+        self.perk_codes = perk_codes
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()
+
+    @classmethod
+    def from_rows(cls, version: str, outlet_rows: List[Dict], perk_rows: List[Dict],
+                  link_rows: List[Dict]) -> "OutletSnapshot":
+        """Assemble a snapshot from raw outlets, perks and outlet_perks rows"""
+        perks_by_id = {perk["id"]: perk for perk in perk_rows}
+        links = defaultdict(list)
+        for link in link_rows:
+            perk = perks_by_id.get(link["perk_id"])
+            if perk is not None:
+                links[link["outlet_id"]].append(perk)
+
+        outlets = []
+        perk_codes = {}
+        for row in outlet_rows:
+            outlet_perks = links.get(row["id"], [])
+            codes = [perk["code"] for perk in outlet_perks]
+            names = [perk["name"] for perk in outlet_perks]
+            outlets.append({
+                "id": row["id"],
+                "name": row["name"],
+                "address": row["address"],
+                "waze_link": row["waze_link"],
+                "latitude": _as_float(row["latitude"]),
+                "longitude": _as_float(row["longitude"]),
+                "perks": names,
+                "perk_codes": ",".join(codes) or None,
+                "perk_names": ",".join(names) or None,
+            })
+            perk_codes[row["id"]] = frozenset(codes)
+
+        return cls(version, outlets, list(perk_rows), perk_codes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "outlets": self.outlets,
+            "perks": self.perks,
+            "perk_codes": {str(outlet_id): sorted(codes) for outlet_id, codes in self.perk_codes.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OutletSnapshot":
+        """Rebuild a snapshot written by to_dict; keeps the original load time for Last-Modified"""
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"unsupported snapshot format {data.get('format')!r}")
+        perk_codes = {int(outlet_id): frozenset(codes) for outlet_id, codes in data["perk_codes"].items()}
+        snapshot = cls(data["version"], data["outlets"], data["perks"], perk_codes, source="file")
+        snapshot.loaded_at = data["loaded_at"]
+        return snapshot
+
+    def page(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Keyset page of outlets with id > after_id, in id order"""
+        start = bisect.bisect_right(self.ids, after_id) if after_id is not None else 0
+        end = start + limit if limit is not None else len(self.outlets)
+        return self.outlets[start:end]
+
+    def derived(self, name: str, build: Callable[["OutletSnapshot"], Any]) -> Any:
+        """Memoize a structure computed from this snapshot (indexes, caches)"""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = build(self)
+            return self._derived[name]
+
+
+class OutletStore:
+    """Holds the current outlet snapshot and swaps it when the data version changes"""
+
+    def __init__(self, pool, poll_interval: float = VERSION_POLL_SECONDS, path: Optional[str] = SNAPSHOT_PATH):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.path = path
+        self._snapshot: Optional[OutletSnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_checked: Optional[float] = None
+        self.refresh_count = 0
+        self.db_synced = False
+        self.last_error: Optional[str] = None
+        self._listeners: List[Callable[[OutletSnapshot], Any]] = []
+
+    def get(self) -> OutletSnapshot:
+        """Return the current snapshot, loading it on first use"""
+        if self._needs_check():
+            self._refresh_or_keep()
+        return self._snapshot
+
+    async def get_async(self) -> OutletSnapshot:
+        """Like get(), but any DB work runs on the pool's executor instead of the event loop"""
+        if self._needs_check():
+            await self.pool.run_async(self._refresh_or_keep)
+        return self._snapshot
+
+    def _needs_check(self) -> bool:
+        # A poll interval of 0 disables the background thread and validates
+        # the data version on every read instead.
+        return self._snapshot is None or self.poll_interval <= 0
+
+    def _refresh_or_keep(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            if self._snapshot is None:
+                raise
+            print(f"Warning: Could not refresh outlet snapshot, serving version {self._snapshot.version}: {e}")
+
+    def install(self, snapshot: OutletSnapshot):
+        """Replace the current snapshot and notify listeners"""
+        self._snapshot = snapshot
+        self.refresh_count += 1
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Warning: Outlet snapshot listener failed: {e}")
+
+    def add_listener(self, listener: Callable[[OutletSnapshot], Any]):
+        """Call listener(snapshot) after every install, in the installing thread"""
+        self._listeners.append(listener)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload outlets if the data version changed; returns True when swapped"""
+        if not force and self._snapshot is not None:
+            # Unchanged-version checks run concurrently; only reloads serialize.
+            if self._fetch_version() == self._snapshot.version:
+                return False
+
+        with self._refresh_lock:
+            current = self._snapshot
+            # All reads share one connection and transaction so the version
+            # and the rows it describes come from the same consistent read view.
+            with self.pool.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    version = self._version_of(fetch_all(cursor, VERSION_SQL)[0])
+                    self._checked()
+                    if not force and current is not None and current.version == version:
+                        return False
+
+                    outlet_rows = fetch_all(cursor, OUTLETS_SQL)
+                    perk_rows = fetch_all(cursor, PERKS_SQL)
+                    link_rows = fetch_all(cursor, OUTLET_PERKS_SQL)
+                finally:
+                    cursor.close()
+
+            self.install(OutletSnapshot.from_rows(version, outlet_rows, perk_rows, link_rows))
+            return True
+
+    def _fetch_version(self) -> str:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                version = self._version_of(fetch_all(cursor, VERSION_SQL)[0])
+            finally:
+                cursor.close()
+        self._checked()
+        return version
+
+    def _checked(self):
+        self.last_checked = time.time()
+        self.db_synced = True
+        self.last_error = None
+
+    @staticmethod
+    def _version_of(row: Dict) -> str:
+        fingerprint = "|".join(f"{key}={row[key]}" for key in sorted(row))
+        return hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+    # ----- snapshot file -----
+    def load_file(self) -> bool:
+        """Install the snapshot saved by the last run, if any; returns True on success"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                snapshot = OutletSnapshot.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Warning: Could not load outlet snapshot from {self.path}: {e}")
+            return False
+        with self._refresh_lock:
+            # A database load that finished first is never replaced by older data.
+            if self._snapshot is not None:
+                return False
+            self.install(snapshot)
+        return True
+
+    def save_file(self):
+        """Write the current snapshot atomically next to its final path"""
+        snapshot = self._snapshot
+        if not self.path or snapshot is None:
+            return
+        data = json.dumps(snapshot.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    # ----- background loading and polling -----
+    def start(self):
+        """Sync with the database in a daemon thread, retrying until it answers, then poll the data version"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="outlet-store-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background poller"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _poll(self):
+        delay = RETRY_INITIAL_SECONDS
+        while not self.db_synced and not self._sync():
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, RETRY_MAX_SECONDS)
+        if self.poll_interval <= 0:
+            return
+        while not self._stop.wait(self.poll_interval):
+            self._sync()
+
+    def _sync(self) -> bool:
+        try:
+            swapped = self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Warning: Could not refresh outlet snapshot: {e}")
+            return False
+        if swapped:
+            try:
+                self.save_file()
+            except OSError as e:
+                print(f"Warning: Could not save outlet snapshot: {e}")
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the loaded snapshot for health reporting"""
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "source": snapshot.source if snapshot else None,
+            "db_synced": self.db_synced,
+            "version": snapshot.version if snapshot else None,
+            "outlet_count": len(snapshot.outlets) if snapshot else 0,
+            "loaded_at": _iso(snapshot.loaded_at) if snapshot else None,
+            "last_checked": _iso(self.last_checked) if self.last_checked else None,
+            "refresh_count": self.refresh_count,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from outlet_keys import outlet_key, perk_code, scrape_keys
+
+# -----------------------------
+# WRITER CONFIG
+# -----------------------------
+WRITE_CHUNK_SIZE = int(os.getenv("SCRAPE_WRITE_CHUNK", "500"))
+# A scrape that misses more than this share of open outlets is assumed broken, not a wave of closures.
+MAX_CLOSE_FRACTION = float(os.getenv("SCRAPE_MAX_CLOSE_FRACTION", "0.5"))
+SUMMARY_NAMES = 10  # outlet names listed per kind of change
+
+EXISTING_SQL = """
+    SELECT id, outlet_key, content_hash, name, address, waze_link, latitude, closed_at FROM outlets ORDER BY id
+"""
+INSERT_OUTLETS_SQL = """
+    INSERT INTO outlets (id, outlet_key, content_hash, name, address, waze_link)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+UPDATE_OUTLETS_SQL = """
+    UPDATE outlets
+       SET outlet_key = %s, content_hash = %s, name = %s, address = %s, waze_link = %s, closed_at = NULL
+     WHERE id = %s
+"""
+# A new address invalidates the geocode, so outlet_coords.py picks the outlet up again.
+MOVE_OUTLETS_SQL = """
+    UPDATE outlets
+       SET outlet_key = %s, content_hash = %s, name = %s, address = %s, waze_link = %s, closed_at = NULL,
+           latitude = NULL, longitude = NULL
+     WHERE id = %s
+"""
+INSERT_PERKS_SQL = "INSERT INTO perks (code, name) VALUES (%s, %s)"
+INSERT_LINKS_SQL = "INSERT INTO outlet_perks (outlet_id, perk_id) VALUES (%s, %s)"
+
+
+def stored_key(key: str) -> str:
+    """Fixed-width form of an outlet key for the outlet_key column; address-qualified keys can outgrow VARCHAR(255)"""
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def content_hash(entry: Dict) -> str:
+    """Fingerprint of everything the scraper stores for an outlet"""
+    perks = sorted({perk_code(name) for name in entry['perks']})
+    payload = json.dumps([entry['name'], entry['address'], perks, entry['waze_link']], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class OutletWriter:
+    """Upserts scraped outlets by natural key in chunks, one transaction per chunk over a single connection"""
+
+    def __init__(self, conn, chunk_size: int = WRITE_CHUNK_SIZE,
+                 max_close_fraction: float = MAX_CLOSE_FRACTION):
+        self.conn = conn
+        self.chunk_size = max(1, chunk_size)
+        self.max_close_fraction = max_close_fraction
+        self._buffer: List[Tuple[Optional[Dict], Dict, str, str]] = []  # (existing row, entry, stored key, hash)
+        self._perk_ids: Optional[Dict[str, int]] = None
+        self._existing: Optional[List[Dict]] = None
+        self._by_key: Dict[str, Dict] = {}
+        self._by_name: Dict[str, List[Dict]] = {}
+        self._by_address: Dict[str, List[Dict]] = {}  # open rows by normalized address
+        self._claimed: set = set()  # ids of stored rows matched by this scrape
+        self._seen: set = set()     # keys assigned in this scrape
+        self.changes: Dict[str, List[str]] = {
+            "inserted": [], "updated": [], "moved": [], "reopened": [], "unchanged": [], "closed": [],
+        }
+        self.stats = {"rows": 0, "perks": 0, "links": 0, "chunks": 0, "seconds": 0.0}
+
+    def __enter__(self) -> "OutletWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    # ----- matching -----
+    def _load_existing(self):
+        cur = self.conn.cursor(dictionary=True)
+        try:
+            cur.execute(EXISTING_SQL)
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        self._existing = rows
+        self._by_key = {row['outlet_key']: row for row in rows if row['outlet_key']}
+        # Rows of one name, geocoded and oldest first, so copies left by earlier blind
+        # inserts resolve to the row worth keeping; the others are closed as vanished.
+        self._by_name = {}
+        self._by_address = {}
+        for row in sorted(rows, key=lambda row: (row['latitude'] is None, row['id'])):
+            self._by_name.setdefault(outlet_key(row['name']), []).append(row)
+            if row['closed_at'] is None and row['address']:
+                self._by_address.setdefault(outlet_key(None, row['address']), []).append(row)
+
+    def _unclaimed(self, name: Optional[str]) -> List[Dict]:
+        return [row for row in self._by_name.get(outlet_key(name), []) if row['id'] not in self._claimed]
+
+    def _match_all(self, keyed: List[Tuple[str, Dict]]) -> List[Optional[Dict]]:
+        """The stored row each scraped outlet continues, if any, claiming them for this scrape"""
+        matches: List[Optional[Dict]] = [None] * len(keyed)
+
+        def claim(position: int, row: Dict):
+            matches[position] = row
+            self._claimed.add(row['id'])
+
+        # Exact keys first, so no outlet's fallback can take a row another outlet is keyed to.
+        for position, (key, _) in enumerate(keyed):
+            row = self._by_key.get(stored_key(key))
+            if row is not None and row['id'] not in self._claimed:
+                claim(position, row)
+        for position, (_, entry) in enumerate(keyed):
+            if matches[position] is None:
+                address = outlet_key(None, entry['address'] or '')
+                row = next((row for row in self._unclaimed(entry['name'])
+                            if outlet_key(None, row['address'] or '') == address), None)
+                if row is not None:
+                    claim(position, row)
+        # An outlet left over as the only one of its name, with one stored row of that name
+        # also left over, moved; with more on either side they cannot be told apart.
+        leftovers: Dict[str, List[int]] = {}
+        for position, (_, entry) in enumerate(keyed):
+            if matches[position] is None:
+                leftovers.setdefault(outlet_key(entry['name']), []).append(position)
+        for name, positions in leftovers.items():
+            rows = self._unclaimed(name)
+            if len(positions) == 1 and len(rows) == 1:
+                claim(positions[0], rows[0])
+        # Likewise an outlet left over at an address where one open row is left over was renamed,
+        # and keeps its id and geocode.
+        leftovers = {}
+        for position, (_, entry) in enumerate(keyed):
+            if matches[position] is None and entry['address']:
+                leftovers.setdefault(outlet_key(None, entry['address']), []).append(position)
+        for address, positions in leftovers.items():
+            rows = [row for row in self._by_address.get(address, []) if row['id'] not in self._claimed]
+            if len(positions) == 1 and len(rows) == 1:
+                claim(positions[0], rows[0])
+        return matches
+
+    def write(self, entries: List[Dict]):
+        """Upsert a scrape's {'name', 'address', 'waze_link', 'perks'} entries, writing chunks as they fill
+
+        An entry without 'waze_link' (its link failed to resolve) keeps the stored one.
+        """
+        if self._existing is None:
+            self._load_existing()
+        keyed = []
+        for key, entry in zip(scrape_keys((entry['name'], entry['address']) for entry in entries), entries):
+            if key in self._seen:
+                print(f"[WARN] Skipping duplicate outlet '{entry['name']}' at '{entry['address']}'.")
+                continue
+            self._seen.add(key)
+            keyed.append((key, entry))
+        for (key, entry), existing in zip(keyed, self._match_all(keyed)):
+            self._add(key, entry, existing)
+
+    def _add(self, key: str, entry: Dict, existing: Optional[Dict]):
+        if 'waze_link' not in entry:
+            entry = dict(entry, waze_link=existing['waze_link'] if existing is not None else None)
+        fingerprint = content_hash(entry)
+        key = stored_key(key)
+        if existing is not None and existing['content_hash'] == fingerprint and existing['outlet_key'] == key \
+                and existing['closed_at'] is None:
+            self.changes["unchanged"].append(entry['name'])
+            return
+        self._buffer.append((existing, entry, key, fingerprint))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    # ----- writing -----
+    def flush(self):
+        """Write queued inserts and updates, their new perks and their perk links in one transaction"""
+        if not self._buffer:
+            return
+        started = time.perf_counter()
+        cur = self.conn.cursor()
+        try:
+            perk_ids, new_perks = self._ensure_perks(cur, (entry for _, entry, _, _ in self._buffer))
+            # Ids are assigned here rather than read back from a multi-row insert, whose
+            # auto-increment values are only consecutive without concurrent inserts. The
+            # scraper is the only writer of outlets.
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM outlets")
+            next_id = cur.fetchone()[0] + 1
+            inserts, updates, moves, relinked, link_rows = [], [], [], [], []
+            changes: List[Tuple[str, str]] = []
+            for existing, entry, key, fingerprint in self._buffer:
+                values = (key, fingerprint, entry['name'], entry['address'], entry['waze_link'])
+                if existing is None:
+                    outlet_id = next_id
+                    next_id += 1
+                    inserts.append((outlet_id,) + values)
+                    changes.append(("inserted", entry['name']))
+                else:
+                    outlet_id = existing['id']
+                    relinked.append(outlet_id)
+                    if existing['content_hash'] == fingerprint:
+                        # Same content: either reopened, or only the key changed (its name stopped or started being shared).
+                        updates.append(values + (outlet_id,))
+                        changes.append(("updated" if existing['closed_at'] is None else "reopened", entry['name']))
+                    elif outlet_key(None, existing['address'] or '') != outlet_key(None, entry['address'] or ''):
+                        # Only a real address change drops the geocode; whitespace and case do not.
+                        moves.append(values + (outlet_id,))
+                        changes.append(("moved", entry['name']))
+                    else:
+                        updates.append(values + (outlet_id,))
+                        changes.append(("updated" if existing['closed_at'] is None else "reopened", entry['name']))
+                codes = dict.fromkeys(perk_code(name) for name in entry['perks'])
+                link_rows.extend((outlet_id, perk_ids[code]) for code in codes)
+
+            if inserts:
+                cur.executemany(INSERT_OUTLETS_SQL, inserts)
+            if updates:
+                cur.executemany(UPDATE_OUTLETS_SQL, updates)
+            if moves:
+                cur.executemany(MOVE_OUTLETS_SQL, moves)
+            if relinked:
+                placeholders = ", ".join(["%s"] * len(relinked))
+                cur.execute(f"DELETE FROM outlet_perks WHERE outlet_id IN ({placeholders})", tuple(relinked))
+            if link_rows:
+                cur.executemany(INSERT_LINKS_SQL, link_rows)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            self._perk_ids = None  # perks inserted by the failed chunk were rolled back too
+            raise
+        finally:
+            cur.close()
+
+        for kind, name in changes:
+            self.changes[kind].append(name)
+        for existing, entry, key, fingerprint in self._buffer:
+            if existing is not None:
+                existing.update(outlet_key=key, content_hash=fingerprint, address=entry['address'],
+                                waze_link=entry['waze_link'], closed_at=None)
+        elapsed = self._record(started, len(inserts) + len(updates) + len(moves), len(link_rows), new_perks)
+        print(f"[INFO] Wrote {len(inserts)} new and {len(updates) + len(moves)} changed outlets"
+              f" with {len(link_rows)} perk links in {elapsed * 1000:.0f} ms.")
+        self._buffer = []
+
+    def finish(self) -> Dict[str, List[str]]:
+        """Flush, then mark open outlets this scrape did not see as closed; call only after a complete scrape"""
+        self.flush()
+        if self._existing is None:
+            self._load_existing()
+        open_rows = [row for row in self._existing if row['closed_at'] is None]
+        vanished = [row for row in open_rows if row['id'] not in self._claimed]
+        # Rows sharing a name with a row this scrape claimed are mostly copies left by earlier blind
+        # inserts; however many there are, they say nothing about the scrape being broken.
+        claimed_names = {outlet_key(row['name']) for row in self._existing if row['id'] in self._claimed}
+        duplicates = [row for row in vanished if outlet_key(row['name']) in claimed_names]
+        missing = len(vanished) - len(duplicates)
+        open_count = len(open_rows) - len(duplicates)
+        if missing and missing > open_count * self.max_close_fraction:
+            print(f"[WARN] Scrape is missing {missing} of {open_count} open outlets;"
+                  f" not closing them (SCRAPE_MAX_CLOSE_FRACTION={self.max_close_fraction}).")
+            vanished = duplicates
+        if vanished:
+            started = time.perf_counter()
+            closed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ids = [row['id'] for row in vanished]
+            cur = self.conn.cursor()
+            try:
+                placeholders = ", ".join(["%s"] * len(ids))
+                cur.execute(f"UPDATE outlets SET closed_at = %s WHERE id IN ({placeholders})", (closed_at, *ids))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cur.close()
+            for row in vanished:
+                row['closed_at'] = closed_at
+                self.changes["closed"].append(row['name'])
+            self._record(started, len(ids), 0, 0)
+        return self.changes
+
+    def _record(self, started: float, rows: int, links: int, perks: int) -> float:
+        elapsed = time.perf_counter() - started
+        self.stats["rows"] += rows
+        self.stats["links"] += links
+        self.stats["perks"] += perks
+        self.stats["chunks"] += 1
+        self.stats["seconds"] += elapsed
+        return elapsed
+
+    def _ensure_perks(self, cur, entries: Iterable[Dict]) -> Tuple[Dict[str, int], int]:
+        """The perk code -> id map, inserting codes seen for the first time; also returns how many were new"""
+        if self._perk_ids is None:
+            cur.execute("SELECT id, code FROM perks")
+            self._perk_ids = {code: perk_id for perk_id, code in cur.fetchall()}
+        new_perks: Dict[str, str] = {}
+        for entry in entries:
+            for name in entry['perks']:
+                code = perk_code(name)
+                if code not in self._perk_ids and code not in new_perks:
+                    new_perks[code] = name.strip()
+        if new_perks:
+            cur.executemany(INSERT_PERKS_SQL, list(new_perks.items()))
+            placeholders = ", ".join(["%s"] * len(new_perks))
+            cur.execute(f"SELECT id, code FROM perks WHERE code IN ({placeholders})", tuple(new_perks))
+            self._perk_ids.update({code: perk_id for perk_id, code in cur.fetchall()})
+        return self._perk_ids, len(new_perks)
+
+    # ----- reporting -----
+    def summary(self) -> List[str]:
+        """One line per kind of change, naming the first few outlets"""
+        lines = []
+        for kind, names in self.changes.items():
+            line = f"{kind:<10} {len(names):>6}"
+            if names and kind != "unchanged":
+                shown = ", ".join(names[:SUMMARY_NAMES])
+                line += f"  {shown}{', ...' if len(names) > SUMMARY_NAMES else ''}"
+            lines.append(line)
+        return lines
+
+    def report(self) -> str:
+        rows = self.stats["rows"] + self.stats["perks"] + self.stats["links"]
+        seconds = self.stats["seconds"]
+        rate = rows / seconds if seconds else 0.0
+        return (f"{self.stats['rows']} outlet rows, {self.stats['perks']} new perks, {self.stats['links']} perk links"
+                f" in {self.stats['chunks']} transaction(s), {seconds:.2f} s ({rate:,.0f} rows/s)")
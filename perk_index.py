@@ -0,0 +1,95 @@
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+# -----------------------------
+# BITSET LAYOUT
+# -----------------------------
+WORD_BITS = 64
+
+
+class PerkIndex:
+    """Per-outlet perk bitsets keyed by perks.id, one row per snapshot outlet"""
+
+    def __init__(self, ids: np.ndarray, perk_ids: List[int], codes: Dict[str, int], words: np.ndarray):
+        self.ids = ids
+        self.perk_ids = perk_ids
+        self.codes = codes
+        self.words = words
+        self.bit_of = {perk_id: bit for bit, perk_id in enumerate(perk_ids)}
+        self.row_of = {outlet_id: row for row, outlet_id in enumerate(ids.tolist())}
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "PerkIndex":
+        """Build bitsets from a snapshot; rows follow snapshot.outlets order"""
+        perk_ids = sorted(perk["id"] for perk in snapshot.perks)
+        codes = {perk["code"]: perk["id"] for perk in snapshot.perks}
+        bit_of = {perk_id: bit for bit, perk_id in enumerate(perk_ids)}
+        n_words = max(1, -(-len(perk_ids) // WORD_BITS))
+
+        ids = np.array(snapshot.ids, dtype=np.int64)
+        words = np.zeros((len(ids), n_words), dtype=np.uint64)
+        rows, bits = [], []
+        for row, outlet_id in enumerate(snapshot.ids):
+            for code in snapshot.perk_codes.get(outlet_id, ()):
+                perk_id = codes.get(code)
+                if perk_id is not None:
+                    rows.append(row)
+                    bits.append(bit_of[perk_id])
+        if rows:
+            rows = np.array(rows, dtype=np.int64)
+            bits = np.array(bits, dtype=np.uint64)
+            np.bitwise_or.at(words, (rows, (bits // WORD_BITS).astype(np.int64)),
+                             np.left_shift(np.uint64(1), bits % np.uint64(WORD_BITS)))
+        return cls(ids, perk_ids, codes, words)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, codes: Iterable[str]) -> np.ndarray:
+        """Bitset with the bits of the given perk codes set; unknown codes are ignored"""
+        mask = np.zeros(self.words.shape[1], dtype=np.uint64)
+        for code in codes:
+            perk_id = self.codes.get(code)
+            if perk_id is not None:
+                bit = self.bit_of[perk_id]
+                mask[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+        return mask
+
+    def any_of(self, codes: Iterable[str]) -> np.ndarray:
+        """Boolean row mask of outlets offering at least one of the codes"""
+        mask = self.mask(codes)
+        if self.words.shape[1] == 1:
+            return (self.words[:, 0] & mask[0]) != 0
+        return ((self.words & mask) != 0).any(axis=1)
+
+    def all_of(self, codes: Iterable[str]) -> np.ndarray:
+        """Boolean row mask of outlets offering every one of the codes"""
+        codes = list(codes)
+        if any(code not in self.codes for code in codes):
+            return np.zeros(len(self.ids), dtype=bool)
+        mask = self.mask(codes)
+        if self.words.shape[1] == 1:
+            return (self.words[:, 0] & mask[0]) == mask[0]
+        return ((self.words & mask) == mask).all(axis=1)
+
+    def groups_matched(self, groups: Sequence[Iterable[str]], rows: np.ndarray = None) -> np.ndarray:
+        """Per row, how many code groups have at least one code offered (rows defaults to all)"""
+        words = self.words if rows is None else self.words[rows]
+        counts = np.zeros(len(words), dtype=np.int64)
+        for group in groups:
+            mask = self.mask(group)
+            if words.shape[1] == 1:
+                counts += (words[:, 0] & mask[0]) != 0
+            else:
+                counts += ((words & mask) != 0).any(axis=1)
+        return counts
+
+    def rows_for(self, outlet_ids: Iterable[int]) -> np.ndarray:
+        """Row positions of outlet ids in this index"""
+        return np.fromiter((self.row_of[outlet_id] for outlet_id in outlet_ids), dtype=np.int64)
+
+
+def get_perk_index(snapshot) -> PerkIndex:
+    """Perk bitset index for a snapshot, built once per data version"""
+    return snapshot.derived("perk_index", PerkIndex.from_snapshot)
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class KeywordVectors:
+    """Binary keyword vectors for every snapshot outlet, stored column-wise as postings"""
+
+    def __init__(self, postings: Dict[str, np.ndarray], sizes: np.ndarray):
+        self.postings = postings
+        self.sizes = sizes
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[Optional[str]], extract: Callable[[str], List[str]]) -> "KeywordVectors":
+        """One row per text, holding the set of keywords extract() finds in it"""
+        rows = defaultdict(list)
+        sizes = []
+        for row, text in enumerate(texts):
+            keywords = set(extract(text or ''))
+            for keyword in keywords:
+                rows[keyword].append(row)
+            sizes.append(len(keywords))
+        postings = {keyword: np.array(ids, dtype=np.int64) for keyword, ids in rows.items()}
+        return cls(postings, np.array(sizes, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def jaccard(self, keywords: Iterable[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """|query ∩ row| / |query ∪ row| for every row (or the given rows), 0 when either side is empty"""
+        query = set(keywords)
+        sizes = self.sizes if rows is None else self.sizes[rows]
+        if not query:
+            return np.zeros(len(sizes))
+        hits = [self.postings[keyword] for keyword in query if keyword in self.postings]
+        if hits:
+            shared = np.bincount(np.concatenate(hits), minlength=len(self.sizes))
+            shared = shared if rows is None else shared[rows]
+        else:
+            shared = np.zeros(len(sizes), dtype=np.int64)
+        union = len(query) + sizes - shared
+        scores = np.zeros(len(sizes))
+        np.divide(shared, union, out=scores, where=sizes > 0)
+        return scores
+
+
+def top_k(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """Positions of the k highest scores, best first, ties kept in input order (all when k is None)"""
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def get_name_vectors(snapshot, extract: Callable[[str], List[str]]) -> KeywordVectors:
+    """Keyword vectors of outlet names for a snapshot, built once per data version"""
+    return snapshot.derived(
+        "name_vectors",
+        lambda snap: KeywordVectors.from_texts((outlet["name"] for outlet in snap.outlets), extract),
+    )
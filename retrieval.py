@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# -----------------------------
+# RETRIEVAL CONFIG
+# -----------------------------
+INDEX_PATH = os.getenv("RETRIEVAL_INDEX_PATH", os.path.join(os.path.dirname(__file__), "data", "retrieval_index.json.gz"))
+INDEX_FORMAT = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class BM25Index:
+    """Inverted-index BM25 ranker supporting incremental add/remove"""
+
+    def __init__(self, tokenize: Callable[[str], List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.tokenize = tokenize
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_kinds: Dict[str, str] = {}
+        self.doc_hashes: Dict[str, str] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: str, text: str, kind: str = "document"):
+        """Index a document, replacing any previous version with the same id"""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        terms = Counter(self.tokenize(text))
+        for term, freq in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+        length = sum(terms.values())
+        self.doc_lengths[doc_id] = length
+        self.doc_kinds[doc_id] = kind
+        self.doc_hashes[doc_id] = _fingerprint(text)
+        self.doc_terms[doc_id] = list(terms)
+        self.total_length += length
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document from the index; returns False if it was not indexed"""
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return False
+        # Postings are keyed by doc id, so removal only touches the doc's own terms.
+        for term in self.doc_terms.pop(doc_id):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+        self.total_length -= length
+        del self.doc_kinds[doc_id]
+        del self.doc_hashes[doc_id]
+        return True
+
+    def search(self, query: str, k: int = 10, kind: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) by BM25, optionally limited to one document kind"""
+        n_docs = len(self.doc_lengths)
+        if not n_docs or k <= 0:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(self.tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, freq in docs.items():
+                if kind is not None and self.doc_kinds[doc_id] != kind:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1.0) / (freq + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    # ----- persistence -----
+    def to_dict(self) -> Dict:
+        return {
+            "format": INDEX_FORMAT,
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+            "doc_kinds": self.doc_kinds,
+            "doc_hashes": self.doc_hashes,
+            "doc_terms": self.doc_terms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, tokenize: Callable[[str], List[str]]) -> "BM25Index":
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError(f"unsupported retrieval index format {data.get('format')!r}")
+        index = cls(tokenize, data["k1"], data["b"])
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.doc_kinds = data["doc_kinds"]
+        index.doc_hashes = data["doc_hashes"]
+        index.doc_terms = data["doc_terms"]
+        index.total_length = sum(index.doc_lengths.values())
+        return index
+
+
+class Retriever:
+    """Thread-safe BM25 index kept in sync with a document set and persisted to disk"""
+
+    def __init__(self, tokenize: Callable[[str], List[str]], path: Optional[str] = INDEX_PATH):
+        self.tokenize = tokenize
+        self.path = path
+        self.index = BM25Index(tokenize)
+        self.loaded_from_disk = False
+        self._lock = threading.RLock()
+
+    def load(self) -> bool:
+        """Load the persisted index if present; returns True on success"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                index = BM25Index.from_dict(json.load(f), self.tokenize)
+        except Exception as e:
+            print(f"Warning: Could not load retrieval index from {self.path}: {e}")
+            return False
+        with self._lock:
+            self.index = index
+            self.loaded_from_disk = True
+        return True
+
+    def save(self):
+        """Write the index atomically next to its final path"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self.index.to_dict(), separators=(",", ":"))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def sync(self, documents: Dict[str, Tuple[str, str]]) -> Dict[str, int]:
+        """Make the index match {doc_id: (kind, text)}, touching only added, changed and removed docs"""
+        added = updated = removed = 0
+        with self._lock:
+            index = self.index
+            for doc_id in [doc_id for doc_id in index.doc_lengths if doc_id not in documents]:
+                index.remove(doc_id)
+                removed += 1
+            for doc_id, (kind, text) in documents.items():
+                previous = index.doc_hashes.get(doc_id)
+                if previous == _fingerprint(text) and index.doc_kinds[doc_id] == kind:
+                    continue
+                index.add(doc_id, text, kind)
+                if previous is None:
+                    added += 1
+                else:
+                    updated += 1
+        return {"added": added, "updated": updated, "removed": removed, "documents": len(self.index)}
+
+    def search(self, query: str, k: int = 10, kind: Optional[str] = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            return self.index.search(query, k, kind)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            kinds = Counter(self.index.doc_kinds.values())
+            return {
+                "documents": len(self.index),
+                "terms": len(self.index.postings),
+                "kinds": dict(kinds),
+                "loaded_from_disk": self.loaded_from_disk,
+                "path": self.path,
+            }
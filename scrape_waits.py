@@ -0,0 +1,150 @@
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# -----------------------------
+# WAIT CONFIG
+# -----------------------------
+WAIT_CONFIG = {
+    "initial_timeout": float(os.getenv("SCRAPE_WAIT_TIMEOUT", "15")),
+    "min_timeout": float(os.getenv("SCRAPE_WAIT_MIN_TIMEOUT", "2")),
+    "max_timeout": float(os.getenv("SCRAPE_WAIT_MAX_TIMEOUT", "30")),
+    "poll": float(os.getenv("SCRAPE_WAIT_POLL_SECONDS", "0.1")),
+}
+TIMEOUT_FACTOR = 4.0    # a wait may take this many times the slowest recent one for its phase
+TIMEOUT_HISTORY = 20    # recent wait durations remembered per phase
+BLANK_URLS = ("", "about:blank", "data:,")
+
+Locator = Tuple[str, str]
+
+
+class PhaseTimer:
+    """Wall-clock time per scrape phase, with counts and timeouts, for an end-of-run report"""
+
+    def __init__(self):
+        self._stats: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0])  # count, total, max, timeouts
+        self._order: List[str] = []
+
+    def record(self, phase: str, seconds: float, timed_out: bool = False):
+        if phase not in self._stats:
+            self._order.append(phase)
+        stats = self._stats[phase]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3] += int(timed_out)
+
+    @contextmanager
+    def phase(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def report(self) -> List[str]:
+        lines = [f"{'phase':<16} {'count':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'timeouts':>8}"]
+        for phase in self._order:
+            count, total, longest, timeouts = self._stats[phase]
+            lines.append(f"{phase:<16} {count:>6} {total:>9.2f} {total * 1000 / count:>9.1f}"
+                         f" {longest * 1000:>9.1f} {timeouts:>8}")
+        return lines
+
+
+class AdaptiveWait:
+    """WebDriverWait whose timeout per phase follows how long that phase has recently taken"""
+
+    def __init__(self, driver, timer: Optional[PhaseTimer] = None,
+                 initial_timeout: float = WAIT_CONFIG["initial_timeout"],
+                 min_timeout: float = WAIT_CONFIG["min_timeout"],
+                 max_timeout: float = WAIT_CONFIG["max_timeout"],
+                 poll: float = WAIT_CONFIG["poll"]):
+        self.driver = driver
+        self.timer = timer or PhaseTimer()
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.poll = poll
+        self._history: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=TIMEOUT_HISTORY))
+
+    def timeout(self, phase: str) -> float:
+        history = self._history[phase]
+        if not history:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, TIMEOUT_FACTOR * max(history)))
+
+    def until(self, phase: str, condition: Callable[[Any], Any], message: str = "") -> Any:
+        """Poll condition(driver) until truthy and return its value; TimeoutException after the phase timeout"""
+        timeout = self.timeout(phase)
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=self.poll,
+                             ignored_exceptions=(StaleElementReferenceException,))
+        started = time.perf_counter()
+        try:
+            result = wait.until(condition, message or f"{phase} did not finish within {timeout:.1f}s")
+        except TimeoutException:
+            # A timed-out phase counts as its full timeout, so the next one gets more room.
+            self._history[phase].append(timeout)
+            self.timer.record(phase, time.perf_counter() - started, timed_out=True)
+            raise
+        elapsed = time.perf_counter() - started
+        self._history[phase].append(elapsed)
+        self.timer.record(phase, elapsed)
+        return result
+
+
+# -----------------------------
+# CONDITIONS
+# -----------------------------
+def count_at_least(locator: Locator, minimum: int) -> Callable[[Any], Any]:
+    """Truthy (the element count) once at least `minimum` elements match"""
+    def check(driver):
+        count = len(driver.find_elements(*locator))
+        return count if count >= minimum else False
+    return check
+
+
+def count_grows(locator: Locator, previous: int) -> Callable[[Any], Any]:
+    return count_at_least(locator, previous + 1)
+
+
+def is_stale(element) -> Callable[[Any], bool]:
+    """True once the element has been detached or hidden, e.g. a Load More button after the last page"""
+    def check(driver):
+        try:
+            return not element.is_displayed()
+        except StaleElementReferenceException:
+            return True
+    return check
+
+
+def any_of(*conditions: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def check(driver):
+        for condition in conditions:
+            result = condition(driver)
+            if result:
+                return result
+        return False
+    return check
+
+
+def new_window(known_handles: Sequence[str]) -> Callable[[Any], Any]:
+    """The handle of a window that was not open before, once it appears"""
+    known = set(known_handles)
+
+    def check(driver):
+        for handle in driver.window_handles:
+            if handle not in known:
+                return handle
+        return False
+    return check
+
+
+def url_loaded(driver) -> Any:
+    """The current URL once the window has navigated away from a blank page"""
+    url = driver.current_url
+    return url if url not in BLANK_URLS else False
@@ -0,0 +1,302 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# -----------------------------
+# GEO CONSTANTS
+# -----------------------------
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+DEFAULT_CELL_DEGREES = 0.01   # ~1.1km at the equator
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points"""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat * 0.5) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bucket_by_cell(lats: np.ndarray, lons: np.ndarray, lat_cell: float,
+                   lon_cell: float) -> Tuple[np.ndarray, Dict[Tuple[int, int], Tuple[int, int]]]:
+    """Sort points into grid cells; returns the sort order and (row, col) -> slice bounds"""
+    rows = np.floor(lats / lat_cell).astype(np.int64)
+    cols = np.floor(lons / lon_cell).astype(np.int64)
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+
+    cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    if len(order):
+        boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+        starts = np.concatenate(([0], boundaries)).tolist()
+        ends = np.concatenate((boundaries, [len(order)])).tolist()
+        for start, end in zip(starts, ends):
+            cells[(int(rows[start]), int(cols[start]))] = (start, end)
+    return order, cells
+
+
+class GridIndex:
+    """Uniform lat/lon grid over outlet coordinates for k-nearest and radius queries"""
+
+    def __init__(self, ids, lats, lons, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+
+        # Points are stored sorted by cell so each cell is one contiguous slice.
+        order, self.cells = bucket_by_cell(self.lats, self.lons, cell_degrees, cell_degrees)
+        self.ids, self.lats, self.lons = self.ids[order], self.lats[order], self.lons[order]
+        if self.cells:
+            rows = [row for row, _ in self.cells]
+            cols = [col for _, col in self.cells]
+            self.row_range = (min(rows), max(rows))
+            self.col_range = (min(cols), max(cols))
+        else:
+            self.row_range = self.col_range = (0, -1)
+
+    @classmethod
+    def from_outlets(cls, outlets: List[Dict], cell_degrees: float = DEFAULT_CELL_DEGREES) -> "GridIndex":
+        """Index every outlet that has coordinates"""
+        located = [o for o in outlets if o.get("latitude") is not None and o.get("longitude") is not None]
+        return cls(
+            [o["id"] for o in located],
+            [o["latitude"] for o in located],
+            [o["longitude"] for o in located],
+            cell_degrees,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _ring_slices(self, row: int, col: int, ring: int) -> List[Tuple[int, int]]:
+        """Slices of all occupied cells at Chebyshev distance `ring` from (row, col)"""
+        cells = self.cells
+        found = []
+        if ring == 0:
+            cell = cells.get((row, col))
+            return [cell] if cell else found
+        for c in range(col - ring, col + ring + 1):
+            for r in (row - ring, row + ring):
+                cell = cells.get((r, c))
+                if cell:
+                    found.append(cell)
+        for r in range(row - ring + 1, row + ring):
+            for c in (col - ring, col + ring):
+                cell = cells.get((r, c))
+                if cell:
+                    found.append(cell)
+        return found
+
+    def _covered_km(self, lat: float, ring: int) -> float:
+        """Radius guaranteed to be fully searched once rings 0..ring are scanned"""
+        # Distance to the nearest edge of the scanned square; longitude cells
+        # shrink with latitude so use the widest latitude the square touches.
+        edge_lat = min(abs(lat) + (ring + 1) * self.cell_degrees, 89.0)
+        return ring * self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+
+    def _max_ring(self, row: int, col: int) -> int:
+        return max(
+            abs(row - self.row_range[0]), abs(row - self.row_range[1]),
+            abs(col - self.col_range[0]), abs(col - self.col_range[1]),
+        )
+
+    def nearest(self, lat: float, lon: float, k: int = 5,
+                radius_km: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Return up to k (outlet_id, distance_km) pairs ordered by distance"""
+        if not len(self.ids) or k <= 0:
+            return []
+
+        row = math.floor(lat / self.cell_degrees)
+        col = math.floor(lon / self.cell_degrees)
+        max_ring = self._max_ring(row, col)
+        candidates: List[np.ndarray] = []
+        dists: List[np.ndarray] = []
+        best = np.empty(0)
+        ring = 0
+
+        while True:
+            if 8 * ring > len(self.cells):
+                # Probing empty grid cells now costs more than a flat scan.
+                candidates = [np.arange(len(self.ids))]
+                best = haversine_km(lat, lon, self.lats, self.lons)
+                break
+            slices = self._ring_slices(row, col, ring)
+            if slices:
+                idx = np.concatenate([np.arange(start, end) for start, end in slices])
+                candidates.append(idx)
+                dists.append(haversine_km(lat, lon, self.lats[idx], self.lons[idx]))
+                best = np.concatenate(dists)
+            covered = self._covered_km(lat, ring)
+            if radius_km is not None and covered >= radius_km:
+                break
+            if len(best) >= k and np.partition(best, k - 1)[k - 1] <= covered:
+                break
+            if ring >= max_ring:
+                break
+            ring += 1
+
+        if not len(best):
+            return []
+        idx = np.concatenate(candidates)
+        if radius_km is not None:
+            keep = best <= radius_km
+            idx, best = idx[keep], best[keep]
+        if len(best) > k:
+            top = np.argpartition(best, k - 1)[:k]
+            idx, best = idx[top], best[top]
+        order = np.argsort(best, kind="stable")
+        return list(zip(self.ids[idx[order]].tolist(), best[order].tolist()))
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        """Return every (outlet_id, distance_km) within radius_km, nearest first"""
+        return self.nearest(lat, lon, k=len(self.ids), radius_km=radius_km)
+
+
+# -----------------------------
+# OVERLAP ANALYSIS
+# -----------------------------
+# Pairwise blocks are evaluated in chunks of at most this many distances.
+_OVERLAP_BLOCK = 1_000_000
+
+
+def find_overlaps(index: GridIndex, radius_km: float) -> Dict:
+    """Find outlets whose radius_km catchment circles overlap and group them into clusters"""
+    n = len(index)
+    reach_km = 2.0 * radius_km
+    if n == 0:
+        return _overlap_report(radius_km, index.ids, np.zeros(0, dtype=bool), [])
+
+    # Cells are squares whose diagonal is just under 2r, so any two outlets in
+    # the same cell overlap and every occupied cell is a clique. Only links
+    # between neighbouring cells need distance checks.
+    side_km = reach_km / math.sqrt(2.0) * 0.99
+    max_lat = float(np.abs(index.lats).max())
+    min_lat = float(np.abs(index.lats).min())
+    lat_cell = side_km / KM_PER_DEGREE
+    lon_cell = side_km / (KM_PER_DEGREE * math.cos(math.radians(min(min_lat, 89.0))))
+    reach_rows = math.ceil(reach_km / (lat_cell * KM_PER_DEGREE))
+    reach_cols = math.ceil(reach_km / (lon_cell * KM_PER_DEGREE * math.cos(math.radians(min(max_lat, 89.0)))))
+
+    order, cells = bucket_by_cell(index.lats, index.lons, lat_cell, lon_cell)
+    lats, lons = index.lats[order], index.lons[order]
+    overlapping = np.zeros(n, dtype=bool)
+    cell_keys = list(cells)
+    cell_no = {key: i for i, key in enumerate(cell_keys)}
+    parent = list(range(len(cell_keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    lat_reach = reach_km / KM_PER_DEGREE
+    lon_reach = reach_km / (KM_PER_DEGREE * math.cos(math.radians(min(max_lat, 89.0))))
+    around = [(dr, dc) for dr in range(-reach_rows, reach_rows + 1) for dc in range(-reach_cols, reach_cols + 1)
+              if dr or dc]
+    # Forward half of the neighbourhood, so each pair of busy cells is visited once.
+    forward = [(dr, dc) for dr, dc in around if dr > 0 or (dr == 0 and dc > 0)]
+
+    for key, (start, end) in cells.items():
+        row, col = key
+        here = cell_no[key]
+
+        if end - start == 1:
+            # A lone outlet overlaps iff something in the surrounding cells is
+            # within reach; link its cell to every cell holding such a point.
+            neighbours = [(cell_no[(row + dr, col + dc)], cells[(row + dr, col + dc)])
+                          for dr, dc in around if (row + dr, col + dc) in cells]
+            if not neighbours:
+                continue
+            cols_idx = np.concatenate([np.arange(s, e) for _, (s, e) in neighbours])
+            hits = haversine_km(float(lats[start]), float(lons[start]), lats[cols_idx], lons[cols_idx]) <= reach_km
+            if not hits.any():
+                continue
+            overlapping[start] = True
+            seg_starts = np.cumsum([0] + [e - s for _, (s, e) in neighbours[:-1]])
+            for (other_no, _), linked in zip(neighbours, np.logical_or.reduceat(hits, seg_starts).tolist()):
+                if linked:
+                    parent[find(other_no)] = find(here)
+            continue
+
+        overlapping[start:end] = True
+        for dr, dc in forward:
+            other = cells.get((row + dr, col + dc))
+            if other is None or other[1] - other[0] == 1:
+                continue
+            other_no = cell_no[(row + dr, col + dc)]
+            if find(other_no) == find(here):
+                continue
+            if _any_within(lats, lons, (start, end), other, reach_km, lat_reach, lon_reach):
+                parent[find(other_no)] = find(here)
+
+    groups: Dict[int, List[int]] = {}
+    for i, (start, end) in enumerate(cells.values()):
+        groups.setdefault(find(i), []).extend(range(start, end))
+    sorted_ids = index.ids[order]
+    clusters = [sorted(sorted_ids[members].tolist()) for members in groups.values() if len(members) > 1]
+    clusters.sort(key=lambda c: (-len(c), c[0]))
+
+    flags = np.zeros(n, dtype=bool)
+    flags[order] = overlapping
+    return _overlap_report(radius_km, index.ids, flags, clusters)
+
+
+def _any_within(lats, lons, a: Tuple[int, int], b: Tuple[int, int], reach_km: float,
+                lat_reach: float, lon_reach: float) -> bool:
+    """Whether any point of slice a lies within reach_km of any point of slice b"""
+    a_lats, a_lons = lats[a[0]:a[1]], lons[a[0]:a[1]]
+    b_lats, b_lons = lats[b[0]:b[1]], lons[b[0]:b[1]]
+    # Only points inside the other cell's bounding box grown by the reach can pair up.
+    keep_a = ((a_lats >= b_lats.min() - lat_reach) & (a_lats <= b_lats.max() + lat_reach)
+              & (a_lons >= b_lons.min() - lon_reach) & (a_lons <= b_lons.max() + lon_reach))
+    keep_b = ((b_lats >= a_lats.min() - lat_reach) & (b_lats <= a_lats.max() + lat_reach)
+              & (b_lons >= a_lons.min() - lon_reach) & (b_lons <= a_lons.max() + lon_reach))
+    a_lats, a_lons, b_lats, b_lons = a_lats[keep_a], a_lons[keep_a], b_lats[keep_b], b_lons[keep_b]
+    if not len(a_lats) or not len(b_lats):
+        return False
+    chunk = max(1, _OVERLAP_BLOCK // len(b_lats))
+    for i in range(0, len(a_lats), chunk):
+        if (_pairwise_km(a_lats[i:i + chunk], a_lons[i:i + chunk], b_lats, b_lons) <= reach_km).any():
+            return True
+    return False
+
+
+def _pairwise_km(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """Haversine distance matrix between two point sets"""
+    lat1 = np.radians(lats1)[:, None]
+    lat2 = np.radians(lats2)[None, :]
+    dlon = np.radians(lons2)[None, :] - np.radians(lons1)[:, None]
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _overlap_report(radius_km: float, ids: np.ndarray, flags: np.ndarray, clusters: List[List[int]]) -> Dict:
+    total = len(ids)
+    overlapping_ids = sorted(ids[flags].tolist())
+    return {
+        "radius_km": radius_km,
+        "total_outlets": total,
+        "overlapping_outlets": len(overlapping_ids),
+        "efficiency": round((total - len(overlapping_ids)) / total * 100) if total else 0,
+        "overlapping_ids": overlapping_ids,
+        "clusters": clusters,
+    }
+
+
+def get_overlaps(snapshot, radius_km: float) -> Dict:
+    """Overlap report for a snapshot, computed once per radius and data version"""
+    return snapshot.derived(
+        f"overlaps:{radius_km}",
+        lambda snap: find_overlaps(get_spatial_index(snap), radius_km),
+    )
+
+
+def get_spatial_index(snapshot) -> GridIndex:
+    """Grid index for a snapshot, built once per data version"""
+    return snapshot.derived("spatial_index", lambda snap: GridIndex.from_outlets(snap.outlets))
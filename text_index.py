@@ -0,0 +1,137 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Set
+
+# -----------------------------
+# INDEX CONFIG
+# -----------------------------
+FIELDS = ("name", "address")
+GRAM = 3
+MAX_INTERSECT = 3   # candidate sets come from the rarest grams; the substring check does the rest
+
+Postings = Dict[str, FrozenSet[int]]
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def _apply(postings: Postings, added: Dict[str, Set[int]], removed: Dict[str, Set[int]]) -> Postings:
+    """Copy-on-write update: untouched terms share their frozensets with the old index"""
+    updated = dict(postings)
+    for term in added.keys() | removed.keys():
+        ids = updated.get(term, frozenset())
+        if term in removed:
+            ids = ids - removed[term]
+        if term in added:
+            ids = ids | added[term]
+        if ids:
+            updated[term] = frozenset(ids)
+        else:
+            updated.pop(term, None)
+    return updated
+
+
+class TextIndex:
+    """Inverted trigram index over normalized outlet names and addresses"""
+
+    def __init__(self, version: str, normalize: Callable[[str], str], sources: Dict[str, Dict[int, str]],
+                 docs: Dict[str, Dict[int, str]], grams: Dict[str, Postings]):
+        self.version = version
+        self.normalize = normalize
+        self.sources = sources
+        self.docs = docs
+        self.grams = grams
+
+    @classmethod
+    def build(cls, snapshot, normalize: Callable[[str], str]) -> "TextIndex":
+        """Index every outlet of a snapshot from scratch"""
+        empty = {field: {} for field in FIELDS}
+        index = cls("", normalize, empty, empty, empty)
+        return index.updated(snapshot)
+
+    def updated(self, snapshot) -> "TextIndex":
+        """New index for snapshot, re-indexing only outlets whose name or address changed"""
+        sources, docs, grams = {}, {}, {}
+        for field in FIELDS:
+            old_sources, old_docs = self.sources[field], self.docs[field]
+            new_sources = {outlet["id"]: outlet[field] for outlet in snapshot.outlets if outlet[field]}
+            new_docs = {}
+            added_grams, removed_grams = defaultdict(set), defaultdict(set)
+
+            for outlet_id in old_sources.keys() - new_sources.keys():
+                self._collect(removed_grams, outlet_id, old_docs[outlet_id])
+            for outlet_id, source in new_sources.items():
+                if old_sources.get(outlet_id) == source:
+                    new_docs[outlet_id] = old_docs[outlet_id]
+                    continue
+                if outlet_id in old_docs:
+                    self._collect(removed_grams, outlet_id, old_docs[outlet_id])
+                new_docs[outlet_id] = self.normalize(source)
+                self._collect(added_grams, outlet_id, new_docs[outlet_id])
+
+            sources[field] = new_sources
+            docs[field] = new_docs
+            grams[field] = _apply(self.grams[field], added_grams, removed_grams)
+        return TextIndex(snapshot.version, self.normalize, sources, docs, grams)
+
+    @staticmethod
+    def _collect(gram_ids: Dict[str, Set[int]], outlet_id: int, text: str):
+        for gram in _grams(text):
+            gram_ids[gram].add(outlet_id)
+
+    # ----- lookups -----
+    def containing(self, field: str, text: str) -> FrozenSet[int]:
+        """Ids whose normalized field contains the normalized text as a substring"""
+        needle = self.normalize(text)
+        docs = self.docs[field]
+        if len(needle) < GRAM:
+            # Too short for trigrams; scan the (already normalized) documents.
+            return frozenset(outlet_id for outlet_id, doc in docs.items() if needle in doc)
+
+        candidates = self._intersect(self.grams[field], _grams(needle), MAX_INTERSECT)
+        if candidates is None:
+            return frozenset()
+        return frozenset(outlet_id for outlet_id in candidates if needle in docs[outlet_id])
+
+    @staticmethod
+    def _intersect(postings: Postings, terms: Iterable[str], limit: Optional[int] = None) -> Optional[FrozenSet[int]]:
+        lists = []
+        for term in terms:
+            ids = postings.get(term)
+            if not ids:
+                return None
+            lists.append(ids)
+        if not lists:
+            return None
+        lists.sort(key=len)
+        result = lists[0]
+        for ids in lists[1:limit]:
+            result = result & ids
+            if not result:
+                break
+        return result
+
+
+# -----------------------------
+# PER-SNAPSHOT INDEX
+# -----------------------------
+_latest: Optional[TextIndex] = None
+_latest_lock = threading.Lock()
+
+
+def get_text_index(snapshot, normalize: Callable[[str], str]) -> TextIndex:
+    """Text index for a snapshot, derived incrementally from the last one built"""
+    def build(snap) -> TextIndex:
+        global _latest
+        with _latest_lock:
+            previous = _latest
+        if previous is not None and previous.normalize is normalize:
+            index = previous.updated(snap)
+        else:
+            index = TextIndex.build(snap, normalize)
+        with _latest_lock:
+            _latest = index
+        return index
+
+    return snapshot.derived("text_index", build)
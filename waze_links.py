@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# WAZE CONFIG
+# -----------------------------
+WAZE_CONFIG = {
+    "workers": int(os.getenv("WAZE_RESOLVE_WORKERS", "8")),
+    "timeout": float(os.getenv("WAZE_RESOLVE_TIMEOUT", "10")),
+    "cache_path": os.getenv("WAZE_CACHE_PATH", os.path.join(os.path.dirname(__file__), "data", "waze_links.json")),
+}
+HEADERS = {'User-Agent': 'mcd-scraper/requests/1.0'}
+MAX_REDIRECTS = 10
+
+
+def is_final(href: str) -> bool:
+    """True for a waze.com link that already carries its destination, so there is nothing to follow"""
+    url = urlparse(href)
+    if not (url.hostname or '').endswith('waze.com'):
+        return False
+    query = parse_qs(url.query)
+    return 'll' in query or any(value.startswith('ll.') for value in query.get('to', []))
+
+
+class WazeResolver:
+    """Follows Waze anchor redirects concurrently over one pooled session, caching final links per outlet"""
+
+    def __init__(self, workers: int = WAZE_CONFIG["workers"], timeout: float = WAZE_CONFIG["timeout"],
+                 cache_path: Optional[str] = WAZE_CONFIG["cache_path"]):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.max_redirects = MAX_REDIRECTS
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._cache: Dict[str, Dict[str, str]] = self._load_cache()
+        self._lock = threading.Lock()
+        self.stats = {"cached": 0, "direct": 0, "resolved": 0, "failed": 0}
+
+    def _load_cache(self) -> Dict[str, Dict[str, str]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Could not load Waze link cache from {self.cache_path}: {e}")
+            return {}
+
+    def save(self):
+        """Write the cache atomically next to its final path"""
+        if not self.cache_path:
+            return
+        with self._lock:
+            data = json.dumps(self._cache, ensure_ascii=False, indent=0, sort_keys=True)
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.cache_path)
+
+    def resolve(self, href: str) -> str:
+        """Final URL after following redirects; the body is never downloaded"""
+        response = self.session.get(href, allow_redirects=True, timeout=self.timeout, stream=True)
+        response.close()
+        response.raise_for_status()
+        return response.url
+
+    def _resolve_one(self, key: str, href: str) -> Tuple[str, Optional[str]]:
+        try:
+            link = self.resolve(href)
+        except requests.RequestException as e:
+            print(f"[WARN] Could not resolve Waze link for '{key}': {e}")
+            with self._lock:
+                self.stats["failed"] += 1
+                # A transient failure must not cost the outlet the link it had.
+                cached = self._cache.get(key)
+            return key, cached["link"] if cached is not None else None
+        with self._lock:
+            self._cache[key] = {"href": href, "link": link}
+            self.stats["resolved"] += 1
+        return key, link
+
+    def resolve_all(self, items: Iterable[Tuple[str, str]]) -> Dict[str, Optional[str]]:
+        """{outlet key: final link} for (outlet key, anchor href) pairs; only uncached redirects hit the network
+
+        A link that fails to resolve falls back to the last one cached for its key, or is left out.
+        """
+        links: Dict[str, Optional[str]] = {}
+        pending = []
+        for key, href in items:
+            cached = self._cache.get(key)
+            if cached is not None and cached.get("href") == href:
+                links[key] = cached["link"]
+                self.stats["cached"] += 1
+            elif is_final(href):
+                links[key] = href
+                self.stats["direct"] += 1
+            else:
+                pending.append((key, href))
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending)),
+                                    thread_name_prefix="waze-resolve") as executor:
+                links.update((key, link) for key, link in executor.map(lambda item: self._resolve_one(*item), pending)
+                             if link is not None)
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[WARN] Could not save Waze link cache: {e}")
+        return links
+
+    def close(self):
+        self.session.close()